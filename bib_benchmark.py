@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark scripts for BibManager with synthetic bib libraries.
+
+Usage:
+    python bib_benchmark.py library [--entries 1000 10000 100000 1000000]
+        [--toc-depth 4] [--toc-breadth 5] [--no-memory] [--output results.json]
+    python bib_benchmark.py compare old_results.json new_results.json
+    python bib_benchmark.py memory [--entries 100000]
+@author: github.com/sunluelectric
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from bib_parser import BibParser
+from bib_manager import BibManager
+from bib_table_of_contents import BibTableOfContents
+
+LST_JOURNALS = [
+    'IEEE Transactions on Power Systems',
+    'IEEE Transactions on Automatic Control',
+    'IEEE Transactions on Smart Grid',
+    'IEEE Transactions on Signal Processing',
+    'Automatica',
+    'International Journal of Control',
+    'Systems \\& Control Letters',
+    'Journal of the American Statistical Association',
+    'SIAM Journal on Control and Optimization',
+    'Electric Power Systems Research',
+]
+LST_PUBLISHERS = ['IEEE', 'Elsevier', 'Springer', 'Wiley', 'CRC press',
+                  'Cambridge University Press', 'Courier Corporation']
+LST_CONFERENCES = [
+    'IEEE Conference on Decision and Control',
+    'American Control Conference',
+    'IEEE Power \\& Energy Society General Meeting',
+    'IEEE International Conference on Robotics and Automation',
+]
+LST_WORDS = ['robust', 'adaptive', 'state', 'estimation', 'control', 'power',
+             'system', 'distributed', 'optimal', 'stochastic', 'model',
+             'predictive', 'grid', 'sensor', 'placement', 'game', 'theory',
+             'fuzzy', 'learning', 'identification', 'network', 'analysis',
+             'security', 'detection', 'filter', 'Kalman', 'nonlinear']
+LST_SURNAMES = ['Sun', 'Abur', 'Astr{\\"o}m', 'Murray', 'Boyd', 'Kalman',
+                'Nebot', 'Nieto', 'Wittenmark', 'Huber', 'Monticelli', 'Zhang',
+                'Wang', 'Li', 'Chen', 'Smith', 'Garcia', 'M{\\"u}ller']
+LST_GIVEN_NAMES = ['Lu', 'Ali', 'Karl J', 'Richard M', 'Stephen', 'Rudolf E',
+                   'Eduardo M', 'Juan I', 'Bj{\\"o}rn', 'Peter J', 'Alcir',
+                   'Wei', 'Jing', 'Ming', 'John', 'Maria', 'Hans']
+
+
+def return_synthetic_entry(obj_random: random.Random, int_index: int, hex_catid=None):
+    """
+    return_synthetic_entry returns the text of a synthetic bib entry.
+    """
+    str_type = obj_random.choices(
+        ['article', 'inproceedings', 'book', 'online', 'misc'],
+        weights=[60, 25, 8, 4, 3])[0]
+    str_year = str(obj_random.randint(1960, 2024))
+    str_surname = obj_random.choice(LST_SURNAMES)
+    str_key = ''.join(filter(str.isalpha, str_surname)).lower() + str_year + \
+        obj_random.choice(LST_WORDS).lower() + str(int_index)
+    lst_title = obj_random.sample(LST_WORDS, obj_random.randint(3, 8))
+    lst_title[0] = lst_title[0].capitalize()
+    lst_authors = [obj_random.choice(LST_SURNAMES) + ', ' + obj_random.choice(LST_GIVEN_NAMES)
+                   for _ in range(obj_random.randint(1, 5))]
+    lst_fields = [('title', ' '.join(lst_title)),
+                  ('author', ' and '.join(lst_authors))]
+    if str_type == 'article':
+        lst_fields += [('journal', obj_random.choice(LST_JOURNALS)),
+                       ('volume', str(obj_random.randint(1, 80))),
+                       ('number', str(obj_random.randint(1, 12))),
+                       ('pages', str(int_index % 900 + 1) + '--' + str(int_index % 900 + 12))]
+    elif str_type == 'inproceedings':
+        lst_fields += [('booktitle', obj_random.choice(LST_CONFERENCES)),
+                       ('pages', str(int_index % 900 + 1) + '--' + str(int_index % 900 + 6)),
+                       ('organization', 'IEEE')]
+    elif str_type == 'book':
+        lst_fields += [('publisher', obj_random.choice(LST_PUBLISHERS))]
+    elif str_type == 'online':
+        lst_fields += [('url', 'https://example.org/' + str_key),
+                       ('urldate', str_year + '-01-01')]
+    lst_fields.append(('year', str_year))
+    if str_type in ('article', 'book'):
+        lst_fields.append(('publisher', obj_random.choice(LST_PUBLISHERS)))
+    lst_lines = ['@' + str_type + '{' + str_key + ',']
+    for str_field, str_value in lst_fields:
+        lst_lines.append('  ' + str_field + ' = {' + str_value + '},')
+    lst_lines[-1] = lst_lines[-1][:-1]
+    if hex_catid is None:
+        lst_lines.append('}')
+    else:
+        lst_lines.append('} % catid = ' + hex(hex_catid))
+    return '\n'.join(lst_lines) + '\n'
+
+
+def return_synthetic_bib(int_entries: int, int_seed: int = 0):
+    """
+    return_synthetic_bib returns the text of a synthetic bib file with
+    int_entries entries.
+    """
+    obj_random = random.Random(int_seed)
+    return '\n'.join(return_synthetic_entry(obj_random, iter_index)
+                     for iter_index in range(int_entries))
+
+
+def return_synthetic_tocs(int_depth: int, int_breadth: int, obj_random: random.Random = None):
+    """
+    return_synthetic_tocs returns a table of contents in the space list
+    format, int_depth layers deep with int_breadth subsections per section
+    (between 1 and 15). With obj_random, each section has a random number of
+    subsections up to int_breadth and may be a leaf above the last layer.
+    """
+    lst_text = []
+
+    def add_sections(int_layer, str_prefix):
+        int_sections = int_breadth if obj_random is None else obj_random.randint(1, int_breadth)
+        for iter_index in range(int_sections):
+            str_name = str_prefix + str(iter_index + 1)
+            lst_text.append('    ' * int_layer + 'Section ' + str_name)
+            if int_layer + 1 < int_depth and (obj_random is None or obj_random.random() < 0.8):
+                add_sections(int_layer + 1, str_name + '.')
+
+    add_sections(0, '')
+    return lst_text
+
+
+def return_synthetic_library(int_entries: int, int_toc_depth: int = 4, int_toc_breadth: int = 5,
+                             int_seed: int = 0):
+    """
+    return_synthetic_library returns the text of a synthetic bib file with a
+    table of contents and int_entries entries. The catids follow a Zipf-like
+    distribution over the leaf sections; about 10% of the entries are
+    uncategorized, 3% are categorized under a non-leaf section and 2% have
+    an unrecognized catid.
+    """
+    obj_random = random.Random(int_seed)
+    lst_tocs_text = return_synthetic_tocs(int_toc_depth, int_toc_breadth, obj_random)
+    obj_tocs = BibTableOfContents()
+    obj_tocs.create_tocs_from_space_list(lst_tocs_text)
+    lst_leaf_keys = obj_tocs.return_tocs_leaf_keys()
+    obj_random.shuffle(lst_leaf_keys)
+    lst_weights = [1 / (iter_index + 1)**1.1 for iter_index in range(len(lst_leaf_keys))]
+    lst_other_keys = [iter_item for iter_item in obj_tocs.lst_sorted_keys
+                      if iter_item not in obj_tocs.set_leaf_keys] or lst_leaf_keys
+    lst_blocks = ["%% - Table of Contents\n" +
+                  ''.join("%% - > " + iter_item + "\n" for iter_item in lst_tocs_text) +
+                  "%% - End of Table of Contents\n"]
+    for iter_index in range(int_entries):
+        float_draw = obj_random.random()
+        if float_draw < 0.10:
+            hex_catid = None
+        elif float_draw < 0.13:
+            hex_catid = obj_random.choice(lst_other_keys)
+        elif float_draw < 0.15:
+            hex_catid = 0xF0000000 + iter_index % 0x1000
+        else:
+            hex_catid = obj_random.choices(lst_leaf_keys, weights=lst_weights)[0]
+        lst_blocks.append(return_synthetic_entry(obj_random, iter_index, hex_catid))
+    return '\n'.join(lst_blocks)
+
+
+def measure_reference_memory(int_entries: int):
+    """
+    measure_reference_memory parses a synthetic library and compares the
+    memory held by the parsed (slotted, interned) references with the memory
+    held by equivalent references that use a per-instance __dict__ and
+    unshared strings, i.e. the former BibReference layout.
+    Returns a dictionary with both sizes in bytes and their ratio.
+    """
+    str_text = return_synthetic_bib(int_entries)
+    tracemalloc.start()
+    int_base = tracemalloc.get_traced_memory()[0]
+    lst_refs = BibParser.parse_text(str_text)
+    int_slotted = tracemalloc.get_traced_memory()[0] - int_base
+    tracemalloc.stop()
+    tracemalloc.start()
+    int_base = tracemalloc.get_traced_memory()[0]
+    lst_dict_refs = [_DictReference(obj_reference) for obj_reference in lst_refs]
+    int_dict = tracemalloc.get_traced_memory()[0] - int_base
+    tracemalloc.stop()
+    del lst_dict_refs
+    return {'int_entries': int_entries,
+            'int_bytes_dict': int_dict,
+            'int_bytes_slotted': int_slotted,
+            'float_ratio': int_dict / int_slotted}
+
+
+class _DictReference:
+    """
+    _DictReference mimics the former BibReference layout: attributes in a
+    per-instance __dict__ and a separate string object per value.
+    """
+
+    def __init__(self, obj_reference):
+        for str_attribute in obj_reference.__slots__:
+            obj_value = getattr(obj_reference, str_attribute)
+            if isinstance(obj_value, str):
+                # copy the string so that no value is shared
+                obj_value = (obj_value + '.')[:-1]
+            setattr(self, str_attribute, obj_value)
+
+
+def measure_library(int_entries: int, int_toc_depth: int = 4, int_toc_breadth: int = 5,
+                    flag_memory: bool = True):
+    """
+    measure_library writes a synthetic library to a temporary bib file and
+    times the main BibManager operations on it: read_bib,
+    update_dict_refs_categorized and update_bib, as well as the construction
+    of its BibTableOfContents. If flag_memory is True, the operations are run
+    a second time under tracemalloc to find the peak memory of each one,
+    which is kept out of the timing run since tracing slows Python down.
+    Returns a dictionary with the results.
+    """
+    str_text = return_synthetic_library(int_entries, int_toc_depth, int_toc_breadth)
+    lst_tocs_text = BibParser.parse_tocs(str_text)
+    dict_result = {'int_entries': int_entries, 'int_toc_depth': int_toc_depth,
+                   'int_toc_breadth': int_toc_breadth, 'int_toc_sections': len(lst_tocs_text),
+                   'int_file_bytes': len(str_text.encode()), 'dict_phases': {}}
+    with tempfile.TemporaryDirectory() as str_dir:
+        path_bib = os.path.join(str_dir, 'library.bib')
+        with open(path_bib, 'w') as file_bib:
+            file_bib.write(str_text)
+        del str_text
+        for flag_tracing in ([False, True] if flag_memory else [False]):
+            obj_bib_manager = BibManager()
+            obj_bib_manager.path_bib = path_bib
+            lst_phases = [
+                ('tocs', lambda: BibTableOfContents().create_tocs_from_space_list(lst_tocs_text)),
+                ('read_bib', obj_bib_manager.read_bib),
+                ('update_dict_refs_categorized', obj_bib_manager.update_dict_refs_categorized),
+                ('update_bib', lambda: obj_bib_manager.update_bib(path_bib, flag_confirm=False)),
+            ]
+            for str_phase, func_phase in lst_phases:
+                dict_phase = dict_result['dict_phases'].setdefault(str_phase, {})
+                if flag_tracing:
+                    tracemalloc.start()
+                    with redirect_stdout(io.StringIO()):
+                        func_phase()
+                    dict_phase['int_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                else:
+                    float_start = time.perf_counter()
+                    with redirect_stdout(io.StringIO()):
+                        func_phase()
+                    float_seconds = time.perf_counter() - float_start
+                    dict_phase['float_seconds'] = float_seconds
+                    if str_phase != 'tocs':
+                        dict_phase['float_entries_per_second'] = int_entries / max(float_seconds, 1e-9)
+    return dict_result
+
+
+def return_environment():
+    """
+    return_environment returns a description of the machine and the
+    version of the code, stored with the results.
+    """
+    str_revision = None
+    path_head = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.git', 'HEAD')
+    if os.path.isfile(path_head):
+        with open(path_head, 'r') as file_head:
+            str_revision = file_head.read().strip()
+        if str_revision.startswith('ref: '):
+            path_ref = os.path.join(os.path.dirname(path_head), str_revision[5:])
+            if os.path.isfile(path_ref):
+                with open(path_ref, 'r') as file_ref:
+                    str_revision = file_ref.read().strip()
+    return {'str_time': datetime.now().isoformat(timespec='seconds'),
+            'str_python': platform.python_version(),
+            'str_platform': platform.platform(),
+            'int_cpus': os.cpu_count(),
+            'str_revision': str_revision}
+
+
+def return_comparison_printout(dict_old: dict, dict_new: dict):
+    """
+    return_comparison_printout compares two result files of the library
+    benchmark and returns the ratio new/old of the time and the peak memory
+    of each phase at each library size, in a list with printout format.
+    """
+    lst_print = ["Entries     Phase                          Time ratio   Memory ratio"]
+    dict_old_results = {iter_item['int_entries']: iter_item for iter_item in dict_old['lst_results']}
+    for dict_result in dict_new['lst_results']:
+        dict_old_result = dict_old_results.get(dict_result['int_entries'])
+        if dict_old_result is None:
+            continue
+        for str_phase, dict_phase in dict_result['dict_phases'].items():
+            dict_old_phase = dict_old_result['dict_phases'].get(str_phase, {})
+            lst_ratios = []
+            for str_key in ('float_seconds', 'int_peak_bytes'):
+                if dict_phase.get(str_key) and dict_old_phase.get(str_key):
+                    lst_ratios.append(format(dict_phase[str_key] / dict_old_phase[str_key], '.2f'))
+                else:
+                    lst_ratios.append('-')
+            lst_print.append(str(dict_result['int_entries']).ljust(12) + str_phase.ljust(31) +
+                             lst_ratios[0].ljust(13) + lst_ratios[1])
+    return lst_print
+
+
+def main(lst_args=None):
+    """
+    main runs the benchmark selected from the command line.
+    """
+    obj_parser = argparse.ArgumentParser(
+        description="Benchmarks for BibManager with synthetic bib libraries.")
+    obj_subparsers = obj_parser.add_subparsers(dest='str_command', required=True)
+    obj_memory = obj_subparsers.add_parser(
+        'memory', help="memory held by the parsed references")
+    obj_memory.add_argument('--entries', type=int, default=100000)
+    obj_library = obj_subparsers.add_parser(
+        'library', help="time and peak memory of BibManager operations")
+    obj_library.add_argument('--entries', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    obj_library.add_argument('--toc-depth', type=int, default=4)
+    obj_library.add_argument('--toc-breadth', type=int, default=5)
+    obj_library.add_argument('--no-memory', action='store_true',
+                             help="skip the peak memory measurement")
+    obj_library.add_argument('--output', help="path to the JSON result file")
+    obj_compare = obj_subparsers.add_parser(
+        'compare', help="compare two JSON result files of the library benchmark")
+    obj_compare.add_argument('old')
+    obj_compare.add_argument('new')
+    obj_args = obj_parser.parse_args(lst_args)
+    if obj_args.str_command == 'library':
+        dict_output = {'dict_environment': return_environment(), 'lst_results': []}
+        print("Entries     Phase                          Seconds      Entries/s    Peak (MB)")
+        for int_entries in obj_args.entries:
+            dict_result = measure_library(int_entries, obj_args.toc_depth, obj_args.toc_breadth,
+                                          not obj_args.no_memory)
+            dict_output['lst_results'].append(dict_result)
+            for str_phase, dict_phase in dict_result['dict_phases'].items():
+                print(str(int_entries).ljust(12) + str_phase.ljust(31) +
+                      format(dict_phase['float_seconds'], '.3f').ljust(13) +
+                      (format(dict_phase['float_entries_per_second'], '.0f')
+                       if 'float_entries_per_second' in dict_phase else '-').ljust(13) +
+                      (format(dict_phase['int_peak_bytes'] / 2**20, '.1f')
+                       if 'int_peak_bytes' in dict_phase else '-'))
+        if obj_args.output:
+            with open(obj_args.output, 'w') as file_output:
+                json.dump(dict_output, file_output, indent=2)
+    elif obj_args.str_command == 'compare':
+        with open(obj_args.old, 'r') as file_old, open(obj_args.new, 'r') as file_new:
+            lst_print = return_comparison_printout(json.load(file_old), json.load(file_new))
+        for iter_item in lst_print:
+            print(iter_item)
+    if obj_args.str_command == 'memory':
+        dict_result = measure_reference_memory(obj_args.entries)
+        print("Entries:                  " + str(dict_result['int_entries']))
+        print("__dict__ references (MB): " + format(dict_result['int_bytes_dict'] / 2**20, '.1f'))
+        print("Slotted references (MB):  " + format(dict_result['int_bytes_slotted'] / 2**20, '.1f'))
+        print("Ratio:                    " + format(dict_result['float_ratio'], '.2f'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibCache stores the parsed library of a bib file in a binary sidecar
+file next to the bib file, so that an unchanged bib file need not be parsed
+again.
+@author: github.com/sunluelectric
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+# bump CACHE_VERSION whenever the layout of the cached data changes
+CACHE_VERSION = 3
+CACHE_SUFFIX = '.cache'
+
+
+class BibCache:
+    """
+    Class BibCache handles the sidecar cache file of a bib file.
+
+    The cache file holds a header (version stamp, size, mtime and content hash
+    of the bib file) followed by the cached data. The cached data is used only
+    if the version stamp matches CACHE_VERSION and the bib file has not been
+    changed since the cache file was written.
+    """
+
+    def __init__(self, path_bib: str):
+        """
+        Initializes a new instance of the BibCache class.
+
+        Parameters:
+            path_bib (str): The path to the bib file.
+        """
+        self.path_bib = path_bib
+        self.path_cache = path_bib + CACHE_SUFFIX
+
+    def load(self, str_file_input: str = None):
+        """
+        Loads the cached data if the cache file is valid for the bib file.
+
+        Parameters:
+            str_file_input (str): The text of the bib file, if already read.
+            It is used to compare the content hash when the mtime of the bib
+            file has changed but its size has not.
+
+        Returns:
+            dict: The cached data, or None if the cache file is missing,
+            outdated or from another cache version.
+        """
+        if not os.path.isfile(self.path_cache):
+            return None
+        try:
+            obj_stat = os.stat(self.path_bib)
+            with open(self.path_cache, 'rb') as file_cache:
+                dict_header = pickle.load(file_cache)
+                if dict_header.get('int_version') != CACHE_VERSION or \
+                        dict_header.get('int_size') != obj_stat.st_size:
+                    return None
+                if dict_header.get('int_mtime_ns') != obj_stat.st_mtime_ns:
+                    # touched but possibly unchanged; compare the content hash
+                    if str_file_input is None:
+                        with open(self.path_bib, 'r') as file_bib:
+                            str_file_input = file_bib.read()
+                    if dict_header.get('str_hash') != self.return_hash(str_file_input):
+                        return None
+                    dict_data = pickle.load(file_cache)
+                    flag_refresh = True
+                else:
+                    dict_data = pickle.load(file_cache)
+                    flag_refresh = False
+        except (OSError, EOFError, AttributeError, ImportError, IndexError,
+                pickle.UnpicklingError):
+            return None
+        if flag_refresh:
+            # refresh the mtime stamp so that the hash is not compared again
+            try:
+                self.save(dict_data, str_file_input)
+            except OSError:
+                pass
+        return dict_data
+
+    def save(self, dict_data: dict, str_file_input: str):
+        """
+        Writes the cache file for the current state of the bib file.
+
+        Parameters:
+            dict_data (dict): The data to be cached.
+            str_file_input (str): The text of the bib file that dict_data has
+            been parsed from.
+        """
+        obj_stat = os.stat(self.path_bib)
+        dict_header = {
+            'int_version': CACHE_VERSION,
+            'int_size': obj_stat.st_size,
+            'int_mtime_ns': obj_stat.st_mtime_ns,
+            'str_hash': self.return_hash(str_file_input),
+        }
+        str_dir = os.path.dirname(os.path.abspath(self.path_cache))
+        int_fd, path_temp = tempfile.mkstemp(dir=str_dir, suffix=CACHE_SUFFIX)
+        try:
+            with os.fdopen(int_fd, 'wb') as file_cache:
+                pickle.dump(dict_header, file_cache,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(dict_data, file_cache,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path_temp, self.path_cache)
+        except OSError:
+            if os.path.exists(path_temp):
+                os.remove(path_temp)
+            raise
+
+    def remove(self):
+        """
+        Removes the cache file, if it exists.
+        """
+        if os.path.isfile(self.path_cache):
+            os.remove(self.path_cache)
+
+    @staticmethod
+    def return_hash(str_file_input: str):
+        """
+        Returns the content hash of the text of a bib file.
+
+        Parameters:
+            str_file_input (str): The text of the bib file.
+
+        Returns:
+            str: The hexadecimal BLAKE2b digest of the text.
+        """
+        return hashlib.blake2b(str_file_input.encode('utf-8')).hexdigest()
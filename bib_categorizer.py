@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibCategorizer assigns catids to references in bulk from a rules file,
+so that only the references no rule can decide are left for the console.
+@author: github.com/sunluelectric
+"""
+
+import re
+from self_error import GeneralErrorMessage
+
+# field names usable in a rule and the BibReference attribute they match
+DICT_RULE_FIELDS = {
+    'title': 'str_title',
+    'author': 'str_author',
+    'journal': 'str_journal',
+    'booktitle': 'str_booktitle',
+    'publisher': 'str_publisher',
+    'year': 'str_year',
+    'key': 'str_id',
+}
+# rule line, e.g. "title: state estimation => 0x41500000"
+RE_RULE = re.compile(r'^\s*(\w+)\s*:\s*(.+?)\s*=>\s*(?:0x)?([0-9a-fA-F]{1,8})\s*$')
+
+
+class BibCategorizer:
+    """
+    Class BibCategorizer is a rule-based categorization engine.
+
+    A rules file has one rule per line in the format "field: pattern => catid",
+    e.g. "journal: power systems => 0x41100000". The pattern is a regular
+    expression searched case-insensitively in the field; field is one of the
+    keys of DICT_RULE_FIELDS. Blank lines and lines starting with "#" are
+    ignored. The rules are compiled once; the patterns of each field are also
+    combined into a single expression so that a reference is tested against
+    the individual rules of a field only if one of them can match.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the BibCategorizer class.
+        """
+        self.lst_rules = []  # (str_field, str_pattern, hex_catid, obj_regex)
+        self.dict_field_rules = {}  # key: attribute, value: (obj_combined_regex, list of rule indexes)
+
+    def create_rules_from_file(self, path_rules: str, obj_tocs=None):
+        """
+        Reads and compiles the rules from a rules file.
+
+        Parameters:
+            path_rules (str): The path to the rules file.
+            obj_tocs (BibTableOfContents): If given, every catid in the rules
+            must be a leaf section of this table of contents.
+        """
+        with open(path_rules, 'r') as file_rules:
+            self.create_rules_from_list(file_rules.read().split('\n'), obj_tocs)
+
+    def create_rules_from_list(self, lst_text: list, obj_tocs=None):
+        """
+        Compiles the rules from a list of rule lines.
+
+        Parameters:
+            lst_text (list): The rule lines.
+            obj_tocs (BibTableOfContents): If given, every catid in the rules
+            must be a leaf section of this table of contents.
+        """
+        self.lst_rules = []
+        for iter_index, iter_item in enumerate(lst_text):
+            if iter_item.strip() == '' or iter_item.lstrip().startswith('#'):
+                continue
+            obj_match = RE_RULE.match(iter_item)
+            if obj_match is None:
+                raise GeneralErrorMessage(
+                    "Rule in line " + str(iter_index + 1) + " cannot be recognized: " + iter_item)
+            str_field = obj_match.group(1).lower()
+            if str_field not in DICT_RULE_FIELDS:
+                raise GeneralErrorMessage(
+                    "Rule in line " + str(iter_index + 1) + " uses unknown field: " + str_field)
+            hex_catid = int(obj_match.group(3), 16)
+            if obj_tocs is not None and hex_catid not in obj_tocs.set_leaf_keys:
+                raise GeneralErrorMessage(
+                    "Rule in line " + str(iter_index + 1) + " uses a catid that is not a leaf section: " +
+                    hex(hex_catid))
+            try:
+                obj_regex = re.compile(obj_match.group(2), re.IGNORECASE)
+            except re.error as obj_error:
+                raise GeneralErrorMessage(
+                    "Rule in line " + str(iter_index + 1) + " has an invalid pattern: " +
+                    str(obj_error)) from obj_error
+            self.lst_rules.append((str_field, obj_match.group(2), hex_catid, obj_regex))
+        self.__combine_rules()
+
+    def categorize(self, dict_refs: dict, lst_ids: list = None):
+        """
+        Applies the rules to the references in a single pass.
+
+        Parameters:
+            dict_refs (dict): The references (key: reference id, value: BibReference).
+            lst_ids (list): The keys of the references to categorize (default: all).
+
+        Returns:
+            dict: The report with the following keys:
+            - 'dict_assigned': reference key to the catid decided by the rules;
+            - 'dict_conflicts': reference key to the list of catids suggested by
+            matching rules that disagree (no catid is assigned);
+            - 'lst_unmatched': keys of the references no rule matches;
+            - 'lst_rule_hits': per rule, the number of references it matches;
+            - 'lst_rule_conflicts': per rule, the number of its matches that
+            are in conflict with another rule.
+        """
+        if lst_ids is None:
+            lst_ids = list(dict_refs.keys())
+        dict_report = {'dict_assigned': {}, 'dict_conflicts': {}, 'lst_unmatched': [],
+                       'lst_rule_hits': [0] * len(self.lst_rules),
+                       'lst_rule_conflicts': [0] * len(self.lst_rules)}
+        for str_id in lst_ids:
+            obj_reference = dict_refs[str_id]
+            lst_matched = []
+            for str_attribute, (obj_combined, lst_indexes) in self.dict_field_rules.items():
+                str_value = getattr(obj_reference, str_attribute)
+                if str_value is None or not obj_combined.search(str_value):
+                    continue
+                for iter_index in lst_indexes:
+                    if self.lst_rules[iter_index][3].search(str_value):
+                        lst_matched.append(iter_index)
+            if not lst_matched:
+                dict_report['lst_unmatched'].append(str_id)
+                continue
+            for iter_index in lst_matched:
+                dict_report['lst_rule_hits'][iter_index] += 1
+            lst_catids = sorted({self.lst_rules[iter_index][2] for iter_index in lst_matched})
+            if len(lst_catids) == 1:
+                dict_report['dict_assigned'][str_id] = lst_catids[0]
+            else:
+                dict_report['dict_conflicts'][str_id] = lst_catids
+                for iter_index in lst_matched:
+                    dict_report['lst_rule_conflicts'][iter_index] += 1
+        return dict_report
+
+    def return_report_printout(self, dict_report: dict):
+        """
+        Returns the report of categorize in a list with printout format.
+
+        Parameters:
+            dict_report (dict): The report returned by categorize.
+
+        Returns:
+            list: The report lines.
+        """
+        lst_print = ["Hits   Conflicts   Rule"]
+        for iter_index, (str_field, str_pattern, hex_catid, _) in enumerate(self.lst_rules):
+            lst_print.append(str(dict_report['lst_rule_hits'][iter_index]).rjust(4) + "   " +
+                             str(dict_report['lst_rule_conflicts'][iter_index]).rjust(9) + "   " +
+                             str_field + ": " + str_pattern + " => " + hex(hex_catid))
+        lst_print.append(str(len(dict_report['dict_assigned'])) + " assigned, " +
+                         str(len(dict_report['dict_conflicts'])) + " in conflict, " +
+                         str(len(dict_report['lst_unmatched'])) + " unmatched reference(s).")
+        return lst_print
+
+    def __combine_rules(self):
+        """
+        Groups the rules by field and combines the patterns of each field.
+        """
+        dict_field_indexes = {}
+        for iter_index, (str_field, _, _, _) in enumerate(self.lst_rules):
+            dict_field_indexes.setdefault(DICT_RULE_FIELDS[str_field], []).append(iter_index)
+        self.dict_field_rules = {}
+        for str_attribute, lst_indexes in dict_field_indexes.items():
+            try:
+                obj_combined = re.compile(
+                    '|'.join('(?:' + self.lst_rules[iter_index][1] + ')' for iter_index in lst_indexes),
+                    re.IGNORECASE)
+            except re.error:
+                # e.g. group names repeated across patterns; test every rule
+                obj_combined = re.compile('')
+            self.dict_field_rules[str_attribute] = (obj_combined, lst_indexes)
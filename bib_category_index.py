@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibCategoryIndex groups the references of a BibManager by the section
+of the table of contents they belong to, and keeps the grouping up to date as
+references are added, removed or re-categorized.
+@author: github.com/sunluelectric
+"""
+
+
+class BibCategoryIndex:
+    """
+    Class BibCategoryIndex is the category index of the references.
+
+    dict_sections has the same layout as BibManager.dict_refs_categorized: the
+    keys are all the section indexes of the table of contents, plus -1 for the
+    uncategorized references, -2 for the references with an unrecognized catid
+    and -3 for the references categorized not under a leaf section; the values
+    are dictionaries of the references in each section. dict_ref_sections maps
+    each reference key to its section key, so that a reference can be moved
+    or removed without scanning the sections.
+    """
+
+    def __init__(self, obj_tocs):
+        """
+        Initializes a new instance of the BibCategoryIndex class.
+
+        Parameters:
+            obj_tocs (BibTableOfContents): The table of contents.
+        """
+        self.obj_tocs = obj_tocs
+        self.set_tocs_keys = set(obj_tocs.dict_tocs)
+        self.set_tocs_leaf_keys = obj_tocs.set_leaf_keys
+        self.dict_sections = {}
+        self.dict_ref_sections = {}
+        self.__create_empty_sections()
+
+    def create_index_from_refs(self, dict_refs: dict):
+        """
+        Creates the index from all the references.
+
+        Parameters:
+            dict_refs (dict): The references (key: reference id, value: BibReference).
+        """
+        self.__create_empty_sections()
+        if not self.set_tocs_keys:
+            return
+        dict_sections = self.dict_sections
+        dict_ref_sections = self.dict_ref_sections
+        for iter_key, iter_value in dict_refs.items():
+            hex_section = self.return_section_of_catid(iter_value.hex_catid)
+            dict_sections[hex_section][iter_key] = iter_value
+            dict_ref_sections[iter_key] = hex_section
+
+    def return_section_of_catid(self, hex_catid):
+        """
+        Returns the section key of a catid.
+
+        Parameters:
+            hex_catid (int): The catid of a reference, or None.
+
+        Returns:
+            int: hex_catid if it is a leaf section, otherwise -1 (no catid),
+            -2 (unrecognized catid) or -3 (catid not of a leaf section).
+        """
+        if hex_catid is None:
+            return -1
+        if hex_catid not in self.set_tocs_keys:
+            return -2
+        if hex_catid not in self.set_tocs_leaf_keys:
+            return -3
+        return hex_catid
+
+    def add_ref(self, str_id: str, obj_reference):
+        """
+        Adds a reference to the index, or moves it to the section of its
+        current catid if it is already indexed.
+
+        Parameters:
+            str_id (str): The reference key.
+            obj_reference (BibReference): The reference.
+        """
+        self.remove_ref(str_id)
+        hex_section = self.return_section_of_catid(obj_reference.hex_catid)
+        self.dict_sections[hex_section][str_id] = obj_reference
+        self.dict_ref_sections[str_id] = hex_section
+
+    def remove_ref(self, str_id: str):
+        """
+        Removes a reference from the index, if it is indexed.
+
+        Parameters:
+            str_id (str): The reference key.
+        """
+        hex_section = self.dict_ref_sections.pop(str_id, None)
+        if hex_section is not None:
+            del self.dict_sections[hex_section][str_id]
+
+    def return_refs_in_section(self, hex_section: int, flag_descendants: bool = True):
+        """
+        Returns the references in a section.
+
+        Parameters:
+            hex_section (int): The section key.
+            flag_descendants (bool): Whether the references in the subsections
+            of the section are included.
+
+        Returns:
+            dict: The references (key: reference id, value: BibReference).
+        """
+        if hex_section not in self.dict_sections:
+            return {}
+        if not flag_descendants or hex_section < 0:
+            return dict(self.dict_sections[hex_section])
+        dict_refs = {}
+        for iter_item in self.obj_tocs.return_descendant_keys(hex_section):
+            dict_refs.update(self.dict_sections[iter_item])
+        return dict_refs
+
+    def __create_empty_sections(self):
+        """
+        Resets the index to empty sections.
+        """
+        self.dict_sections = {-1: {}, -2: {}, -3: {}}
+        if self.set_tocs_keys:
+            for iter_item in self.obj_tocs.lst_sorted_keys:
+                self.dict_sections[iter_item] = {}
+        self.dict_ref_sections = {}
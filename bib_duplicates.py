@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibDuplicateFinder finds references that are near-duplicates of each
+other, e.g. the same paper under different keys, with MinHash signatures and
+locality-sensitive hashing.
+@author: github.com/sunluelectric
+"""
+
+import re
+from hashlib import blake2b
+from bib_parser import DICT_FIELD_ATTRIBUTE
+
+RE_LATEX = re.compile(r'\\[^a-zA-Z]|[{}]')  # accent commands such as \" and braces
+RE_NON_WORD = re.compile(r'[^a-z0-9]+')
+INT_SHINGLE_LENGTH = 4
+# hashes fit in one digit of a Python int, for fast XOR and min
+INT_HASH_MASK = 2**30 - 1
+
+
+class BibDuplicateFinder:
+    """
+    Class BibDuplicateFinder is a near-duplicate detector.
+
+    The title of a reference is lowercased and stripped of LaTeX accents,
+    braces and punctuation, and cut into overlapping character shingles; the
+    authors contribute their surnames only, so that different initials or
+    given names do not matter. Each shingle is hashed once to 30 bits. The
+    MinHash signature of a reference is computed by one permutation hashing:
+    the hashes are spread over int_permutations bins by their remainder, each
+    bin keeps the minimum, and an empty bin borrows the value of the next
+    non-empty bin (densification), so a signature costs one pass over the
+    shingles instead of one pass per permutation. The signatures are cut into
+    int_bands bands, and two references are candidates if they agree on all
+    the values of any band, so candidates are found in time linear in the
+    number of references. The Jaccard similarity of the shingles of every
+    candidate pair is then computed exactly, and the pairs above the
+    threshold are joined into clusters.
+    """
+
+    def __init__(self, int_permutations: int = 72, int_bands: int = 12, int_seed: int = 0):
+        """
+        Initializes a new instance of the BibDuplicateFinder class.
+
+        Parameters:
+            int_permutations (int): The length of the MinHash signatures.
+            int_bands (int): The number of LSH bands; int_permutations must be
+            a multiple of it. More bands find pairs of lower similarity.
+            int_seed (int): The seed of the shingle hash function.
+        """
+        if int_permutations % int_bands:
+            raise ValueError("int_permutations must be a multiple of int_bands.")
+        self.bytes_key = int_seed.to_bytes(8, 'little')
+        self.int_permutations = int_permutations
+        self.int_bands = int_bands
+        self.int_rows = int_permutations // int_bands
+        self.dict_shingle_hashes = {}  # cache of the hashes of the shingles
+
+    @staticmethod
+    def return_normalized_title(str_title: str):
+        """
+        Returns the normalized title: lowercase words separated by single
+        spaces, without LaTeX accents, braces or punctuation.
+        """
+        return RE_NON_WORD.sub(' ', RE_LATEX.sub('', str_title).lower()).strip()
+
+    @staticmethod
+    def return_normalized_surnames(str_author: str):
+        """
+        Returns the normalized surnames of the authors, in order.
+        """
+        lst_surnames = []
+        for iter_item in RE_LATEX.sub('', str_author).split(' and '):
+            if ',' in iter_item:
+                str_surname = iter_item.split(',')[0]
+            else:
+                str_surname = iter_item.strip().split(' ')[-1]
+            str_surname = RE_NON_WORD.sub('', str_surname.lower())
+            if str_surname:
+                lst_surnames.append(str_surname)
+        return lst_surnames
+
+    def return_shingles(self, obj_reference):
+        """
+        Returns the set of the 30-bit hashes of the shingles of a reference.
+        """
+        set_shingles = set()
+        if obj_reference.str_title:
+            str_title = self.return_normalized_title(obj_reference.str_title)
+            if str_title:
+                set_shingles.update(str_title[iter_index:iter_index + INT_SHINGLE_LENGTH]
+                                    for iter_index in range(max(1, len(str_title) - INT_SHINGLE_LENGTH + 1)))
+        if obj_reference.str_author:
+            set_shingles.update('\0' + iter_item
+                                for iter_item in self.return_normalized_surnames(obj_reference.str_author))
+        dict_shingle_hashes = self.dict_shingle_hashes
+        for str_shingle in set_shingles.difference(dict_shingle_hashes):
+            dict_shingle_hashes[str_shingle] = int.from_bytes(
+                blake2b(str_shingle.encode(), digest_size=4, key=self.bytes_key).digest(),
+                'little') & INT_HASH_MASK
+        return set(map(dict_shingle_hashes.__getitem__, set_shingles))
+
+    def return_signature(self, set_hashes: set):
+        """
+        Returns the MinHash signature of a set of shingle hashes.
+        """
+        int_bins = self.int_permutations
+        lst_signature = [None] * int_bins
+        for int_hash in set_hashes:
+            int_bin = int_hash % int_bins
+            int_value = int_hash // int_bins
+            if lst_signature[int_bin] is None or int_value < lst_signature[int_bin]:
+                lst_signature[int_bin] = int_value
+        # an empty bin takes the value of the next non-empty bin, offset by
+        # the distance so that borrowed and own values differ
+        int_offset = INT_HASH_MASK // int_bins + 1
+        for iter_index in range(int_bins):
+            if lst_signature[iter_index] is None:
+                int_distance = 1
+                while lst_signature[(iter_index + int_distance) % int_bins] is None:
+                    int_distance += 1
+                lst_signature[iter_index] = \
+                    lst_signature[(iter_index + int_distance) % int_bins] + int_distance * int_offset
+        return lst_signature
+
+    def find_duplicates(self, dict_refs: dict, float_threshold: float = 0.8):
+        """
+        Finds the clusters of near-duplicate references.
+
+        Parameters:
+            dict_refs (dict): The references (key: reference id, value: BibReference).
+            float_threshold (float): The minimum Jaccard similarity of the
+            shingles of two references to be duplicates.
+
+        Returns:
+            list: The clusters, each a dictionary with the keys 'lst_ids' (the
+            sorted reference keys) and 'lst_pairs' (the duplicate pairs
+            (str_id_a, str_id_b, float_similarity) in the cluster), sorted
+            by the first key of each cluster.
+        """
+        dict_shingles = {}
+        dict_buckets = {}  # key: (first index of the band, values of the band)
+        int_rows = self.int_rows
+        for str_id, obj_reference in dict_refs.items():
+            set_hashes = self.return_shingles(obj_reference)
+            if not set_hashes:
+                continue
+            dict_shingles[str_id] = set_hashes
+            lst_signature = self.return_signature(set_hashes)
+            for iter_start in range(0, len(lst_signature), int_rows):
+                dict_buckets.setdefault((iter_start, *lst_signature[iter_start:iter_start + int_rows]),
+                                        []).append(str_id)
+        set_candidates = set()
+        for lst_ids in dict_buckets.values():
+            if len(lst_ids) > 1:
+                for iter_index, str_id_a in enumerate(lst_ids):
+                    for str_id_b in lst_ids[iter_index + 1:]:
+                        set_candidates.add((str_id_a, str_id_b) if str_id_a < str_id_b
+                                           else (str_id_b, str_id_a))
+        dict_parents = {}
+        lst_pairs = []
+        for str_id_a, str_id_b in set_candidates:
+            set_a = dict_shingles[str_id_a]
+            set_b = dict_shingles[str_id_b]
+            int_intersection = len(set_a & set_b)
+            float_similarity = int_intersection / (len(set_a) + len(set_b) - int_intersection)
+            if float_similarity >= float_threshold:
+                lst_pairs.append((str_id_a, str_id_b, float_similarity))
+                str_root_a = self.__find_root(dict_parents, str_id_a)
+                str_root_b = self.__find_root(dict_parents, str_id_b)
+                if str_root_a != str_root_b:
+                    dict_parents[str_root_a] = str_root_b
+        dict_clusters = {}
+        for str_id_a, str_id_b, float_similarity in sorted(lst_pairs):
+            dict_cluster = dict_clusters.setdefault(self.__find_root(dict_parents, str_id_a),
+                                                    {'lst_ids': set(), 'lst_pairs': []})
+            dict_cluster['lst_ids'].update((str_id_a, str_id_b))
+            dict_cluster['lst_pairs'].append((str_id_a, str_id_b, float_similarity))
+        lst_clusters = []
+        for dict_cluster in dict_clusters.values():
+            dict_cluster['lst_ids'] = sorted(dict_cluster['lst_ids'])
+            lst_clusters.append(dict_cluster)
+        lst_clusters.sort(key=lambda iter_item: iter_item['lst_ids'][0])
+        return lst_clusters
+
+    @staticmethod
+    def merge_references(lst_refs: list):
+        """
+        Merges duplicate references into one. The reference with the most
+        fields is kept (the first one on ties), and its missing fields and
+        catid are filled in from the other references in order.
+
+        Parameters:
+            lst_refs (list): The duplicate BibReference objects.
+
+        Returns:
+            BibReference: The kept reference, with the merged fields.
+        """
+        obj_kept = max(lst_refs, key=lambda iter_item: sum(
+            1 for str_attribute in DICT_FIELD_ATTRIBUTE.values() if getattr(iter_item, str_attribute)))
+        for obj_reference in lst_refs:
+            if obj_reference is obj_kept:
+                continue
+            for str_attribute in list(DICT_FIELD_ATTRIBUTE.values()) + ['hex_catid']:
+                if getattr(obj_kept, str_attribute) is None:
+                    setattr(obj_kept, str_attribute, getattr(obj_reference, str_attribute))
+        return obj_kept
+
+    @staticmethod
+    def __find_root(dict_parents: dict, str_id: str):
+        """
+        Returns the root of a reference in the union-find forest of clusters,
+        compressing the path on the way.
+        """
+        str_root = str_id
+        while str_root in dict_parents:
+            str_root = dict_parents[str_root]
+        while str_id != str_root:
+            str_parent = dict_parents[str_id]
+            dict_parents[str_id] = str_root
+            str_id = str_parent
+        return str_root
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibEntryIndex records where each entry is located in the text of a bib
+file, and a content hash of each entry, so that only the changed entries need
+to be parsed again when the bib file is reloaded.
+@author: github.com/sunluelectric
+"""
+
+import hashlib
+from bib_parser import BibParser
+
+
+class BibEntryIndex:
+    """
+    Class BibEntryIndex is an entry-offset index of a bib file.
+
+    dict_entries maps the entry key to (int_start, int_end, str_hash), where
+    int_start and int_end are the offsets of the entry in the text of the bib
+    file (from "@" to the end of the closing line of the entry), and str_hash
+    is the content hash of that span. If an entry key appears more than once,
+    the later entry is recorded, in line with dict_refs.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the BibEntryIndex class.
+        """
+        self.dict_entries = {}
+
+    def create_index_from_spans(self, str_text: str, lst_spans: list):
+        """
+        Creates the index from the spans reported by BibParser.parse_text.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+            lst_spans (list): (str_id, int_start, int_end) of each entry.
+        """
+        self.dict_entries = {}
+        for str_id, int_start, int_end in lst_spans:
+            self.dict_entries[str_id] = (
+                int_start, int_end, self.return_hash(str_text[int_start:int_end]))
+
+    def create_index_from_text(self, str_text: str):
+        """
+        Creates the index by scanning the text, without parsing the fields of
+        the entries.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+        """
+        self.create_index_from_spans(
+            str_text, [(str_id, int_start, int_end) for _, str_id, int_start, int_end, _
+                       in BibParser.scan_entries(str_text)])
+
+    def compare(self, obj_new_index):
+        """
+        Compares this (old) index with a new index of the same bib file.
+
+        Parameters:
+            obj_new_index (BibEntryIndex): The index of the new text.
+
+        Returns:
+            tuple: (lst_added, lst_removed, lst_modified), the keys of the
+            entries that are added, removed and modified in the new index.
+        """
+        lst_added = []
+        lst_modified = []
+        for str_id, tuple_entry in obj_new_index.dict_entries.items():
+            tuple_old_entry = self.dict_entries.get(str_id)
+            if tuple_old_entry is None:
+                lst_added.append(str_id)
+            elif tuple_old_entry[2] != tuple_entry[2]:
+                lst_modified.append(str_id)
+        lst_removed = [str_id for str_id in self.dict_entries
+                       if str_id not in obj_new_index.dict_entries]
+        return lst_added, lst_removed, lst_modified
+
+    @staticmethod
+    def return_hash(str_entry: str):
+        """
+        Returns the content hash of the text of an entry.
+
+        Parameters:
+            str_entry (str): The text of the entry.
+
+        Returns:
+            str: The hexadecimal BLAKE2b digest (16 bytes) of the text.
+        """
+        return hashlib.blake2b(str_entry.encode('utf-8'), digest_size=16).hexdigest()
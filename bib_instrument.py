@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibInstrument measures the operations of class BibManager: the wall time
+and, optionally, the peak memory of each phase of an operation (e.g. reading,
+parsing and categorizing in read_bib), together with counters such as the
+lines scanned, the entries built or the bytes written.
+
+The progress messages of BibManager are logged by LOGGER (logger name
+"bib_manager"), which prints them to the console by default; its level and
+handlers can be changed with the logging module, e.g.
+logging.getLogger('bib_manager').setLevel(logging.WARNING).
+@author: github.com/sunluelectric
+"""
+
+import sys
+import json
+import time
+import logging
+import tracemalloc
+from contextlib import contextmanager
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """
+    ConsoleHandler writes the log messages to the current sys.stdout, so that
+    the console output can be redirected like that of print.
+    """
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, obj_stream):
+        pass
+
+
+LOGGER = logging.getLogger('bib_manager')
+if not LOGGER.handlers:
+    LOGGER.addHandler(ConsoleHandler())
+    LOGGER.setLevel(logging.INFO)
+    LOGGER.propagate = False
+
+
+class BibInstrument:
+    """
+    Class BibInstrument collects the report of the last operation.
+
+    An operation is timed from start to end, and is divided into phases; an
+    operation started within another one (e.g. the categorization within
+    update_bib) is recorded as a phase of the outer one. A counter is added
+    to the innermost phase and to the totals of the operation. If flag_memory
+    is True, the peak of the memory traced by tracemalloc is recorded for the
+    operation and for each phase; tracing slows Python down severalfold, so
+    the timings of a traced operation are not representative.
+
+    When the instrumentation is disabled, nothing is measured and the report
+    is left unchanged.
+    """
+
+    def __init__(self, flag_enabled: bool = False, flag_memory: bool = False, path_report: str = None):
+        """
+        Initializes a new instance of the BibInstrument class.
+
+        Parameters:
+            flag_enabled (bool): Whether the operations are measured.
+            flag_memory (bool): Whether the peak memory is measured.
+            path_report (str): The path to a file to which the report of each
+            operation is appended as a line of JSON, or None.
+        """
+        self.flag_enabled = flag_enabled
+        self.flag_memory = flag_memory
+        self.path_report = path_report
+        self.dict_report = {}  # report of the last operation
+        self.lst_phases = []  # phases being measured, innermost last
+
+    @contextmanager
+    def operation(self, str_name: str):
+        """
+        Measures an operation; a new report is started unless another
+        operation is running, in which case this one is a phase of it.
+
+        Parameters:
+            str_name (str): The name of the operation.
+        """
+        if not self.flag_enabled or self.lst_phases:
+            with self.phase(str_name):
+                yield
+            return
+        flag_tracing = self.flag_memory and not tracemalloc.is_tracing()
+        if flag_tracing:
+            tracemalloc.start()
+        self.dict_report = {'str_operation': str_name, 'float_seconds': 0.0,
+                            'dict_counters': {}, 'dict_phases': {}}
+        self.lst_phases.append(self.dict_report)
+        if self.flag_memory:
+            tracemalloc.reset_peak()
+        float_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.dict_report['float_seconds'] = time.perf_counter() - float_start
+            if self.flag_memory:
+                self.dict_report['int_peak_bytes'] = max(
+                    [tracemalloc.get_traced_memory()[1]] +
+                    [iter_value.get('int_peak_bytes', 0)
+                     for iter_value in self.dict_report['dict_phases'].values()])
+            if flag_tracing:
+                tracemalloc.stop()
+            self.lst_phases = []
+            if self.path_report is not None:
+                with open(self.path_report, 'a') as file_report:
+                    file_report.write(json.dumps(self.dict_report) + '\n')
+
+    @contextmanager
+    def phase(self, str_name: str):
+        """
+        Measures a phase of the running operation. The time, counters and
+        peak memory of a phase run more than once are accumulated.
+
+        Parameters:
+            str_name (str): The name of the phase.
+        """
+        if not self.flag_enabled or not self.lst_phases:
+            yield
+            return
+        dict_phase = self.dict_report['dict_phases'].setdefault(str_name, {'float_seconds': 0.0})
+        if self.flag_memory:
+            # the peak so far belongs to the enclosing phase
+            int_peak = tracemalloc.get_traced_memory()[1]
+            dict_outer = self.lst_phases[-1]
+            if dict_outer is not self.dict_report:
+                dict_outer['int_peak_bytes'] = max(dict_outer.get('int_peak_bytes', 0), int_peak)
+            tracemalloc.reset_peak()
+        self.lst_phases.append(dict_phase)
+        float_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            dict_phase['float_seconds'] += time.perf_counter() - float_start
+            self.lst_phases.pop()
+            if self.flag_memory:
+                dict_phase['int_peak_bytes'] = max(dict_phase.get('int_peak_bytes', 0),
+                                                   tracemalloc.get_traced_memory()[1])
+
+    def count(self, str_name: str, int_value: int = 1):
+        """
+        Adds to a counter of the innermost phase and of the operation.
+
+        Parameters:
+            str_name (str): The name of the counter, e.g. 'int_entries_built'.
+            int_value (int): The amount to add.
+        """
+        if not self.flag_enabled or not self.lst_phases:
+            return
+        dict_counters = self.dict_report['dict_counters']
+        dict_counters[str_name] = dict_counters.get(str_name, 0) + int_value
+        if len(self.lst_phases) > 1:
+            dict_phase = self.lst_phases[-1]
+            dict_phase[str_name] = dict_phase.get(str_name, 0) + int_value
+
+    def write_report(self, path_report: str):
+        """
+        Writes the report of the last operation to a JSON file.
+
+        Parameters:
+            path_report (str): The path to the JSON file.
+        """
+        with open(path_report, 'w') as file_report:
+            json.dump(self.dict_report, file_report, indent=2)
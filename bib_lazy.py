@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibLazyReferenceDict is a dictionary of references that parses each
+reference from the text of the bib file only when it is first accessed.
+@author: github.com/sunluelectric
+"""
+
+from collections.abc import MutableMapping
+from bib_parser import BibParser
+
+
+class BibLazyReferenceDict(MutableMapping):
+    """
+    Class BibLazyReferenceDict behaves like the dict_refs dictionary of
+    BibManager (key: reference id, value: BibReference), but is created from a
+    quick scan that finds only the entry keys and their offsets. The fields of
+    an entry are parsed the first time the entry is accessed, and the
+    resulting BibReference is kept for later accesses.
+    """
+
+    def __init__(self, str_text: str, dict_spans: dict):
+        """
+        Initializes a new instance of the BibLazyReferenceDict class.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+            dict_spans (dict): The entry key mapped to (int_start, int_end),
+            the offsets of the entry in str_text.
+        """
+        self.str_text = str_text
+        self.dict_spans = dict_spans
+        self.dict_loaded = {}
+
+    @classmethod
+    def create_from_text(cls, str_text: str):
+        """
+        Creates the dictionary by scanning the text for entry keys and offsets.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+
+        Returns:
+            BibLazyReferenceDict: The dictionary with no reference parsed yet.
+        """
+        dict_spans = {}
+        for _, str_id, int_start, int_end, _ in BibParser.scan_entries(str_text):
+            dict_spans[str_id] = (int_start, int_end)
+        return cls(str_text, dict_spans)
+
+    def return_loaded_count(self):
+        """
+        Returns the number of references that have been parsed or set.
+
+        Returns:
+            int: The number of materialized references.
+        """
+        return len(self.dict_loaded)
+
+    def __getitem__(self, str_id):
+        obj_reference = self.dict_loaded.get(str_id)
+        if obj_reference is None:
+            tuple_span = self.dict_spans[str_id]
+            if tuple_span is None:
+                raise KeyError(str_id)
+            obj_reference = BibParser.parse_entry(self.str_text, *tuple_span)
+            self.dict_loaded[str_id] = obj_reference
+        return obj_reference
+
+    def __setitem__(self, str_id, obj_reference):
+        if str_id not in self.dict_spans:
+            self.dict_spans[str_id] = None
+        self.dict_loaded[str_id] = obj_reference
+
+    def __delitem__(self, str_id):
+        del self.dict_spans[str_id]
+        self.dict_loaded.pop(str_id, None)
+
+    def __contains__(self, str_id):
+        return str_id in self.dict_spans
+
+    def __iter__(self):
+        return iter(self.dict_spans)
+
+    def __len__(self):
+        return len(self.dict_spans)
+
+    def __repr__(self):
+        return (self.__class__.__name__ + "(" + str(len(self)) + " references, " +
+                str(self.return_loaded_count()) + " loaded)")
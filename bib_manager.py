@@ -18,10 +18,21 @@ metadata) in the bib file;
 """
 
 import os
-import re
-from datetime import datetime
+import logging
 from bib_table_of_contents import BibTableOfContents
-from bib_reference import PublicationType, BibReference
+from bib_parser import BibParser
+from bib_cache import BibCache
+from bib_index import BibEntryIndex
+from bib_lazy import BibLazyReferenceDict
+from bib_categorizer import BibCategorizer
+from bib_suggester import BibCatidSuggester
+from bib_search import BibSearchIndex
+from bib_replace import BibReplacer
+from bib_duplicates import BibDuplicateFinder
+from bib_merge import BibMerger
+from bib_writer import BibWriter
+from bib_category_index import BibCategoryIndex
+from bib_instrument import BibInstrument, LOGGER
 
 AUTHOR_NAME = "SUN LU"
 
@@ -31,13 +42,30 @@ class BibManager:
     Class BibManager defines a bib file management tool for LaTeX users.
     """
 
-    def __init__(self):
+    def __init__(self, flag_quiet=False):
         self.path_bib = None
+        # progress messages are logged by LOGGER; flag_quiet keeps only the
+        # warnings and errors
+        self.flag_quiet = flag_quiet
+        self.obj_instrument = BibInstrument()
         self.obj_tocs = BibTableOfContents()
         self.obj_tocs.create_tocs_from_multidimensional_list(
             ['Default Section'])
         self.dict_refs = {}
         self.dict_refs_categorized = {}
+        self.obj_refs_index = None
+        # self.dict_refs_categorized is kept by self.obj_category_index once
+        # flag_category_index_complete is True
+        self.obj_category_index = BibCategoryIndex(self.obj_tocs)
+        self.flag_category_index_complete = False
+        # built by the first search_refs, then kept by add_ref and remove_ref
+        self.obj_search_index = None
+        # changes since the last read or update of the bib file
+        self.set_dirty_sections = set()
+        self.flag_tocs_dirty = True
+        # layout of the bib file written by the last update_bib
+        self.dict_written_sections = {}
+        self.tuple_written_stamp = None
 
     def set_path(self, path_bib):
         """
@@ -50,7 +78,28 @@ class BibManager:
                 file_bib.write("%% - Name of bib file: " +
                                self.path_bib.split('/')[-1] + "\n")
         self.path_bib = path_bib
-        print("The path to the bib file has been confirmed.")
+        self.__log("The path to the bib file has been confirmed.")
+
+    def set_instrumentation(self, flag_enabled=True, flag_memory=False, path_report=None):
+        """
+        set_instrumentation turns the measurement of the operations read_bib,
+        reload_bib, merge_bibs, update_dict_refs_categorized and update_bib
+        on or off (see BibInstrument). The wall time, counters (e.g. lines
+        scanned, entries built, bytes written) and, if flag_memory is True,
+        the tracemalloc peak of each phase are returned by
+        return_last_report after each operation; if path_report is given,
+        each report is also appended to it as a line of JSON.
+        """
+        self.obj_instrument = BibInstrument(flag_enabled, flag_memory, path_report)
+
+    def return_last_report(self):
+        """
+        return_last_report returns the report of the last measured operation
+        as a dictionary with the keys 'str_operation', 'float_seconds',
+        'dict_counters', 'dict_phases' and, if the memory is measured,
+        'int_peak_bytes'. It is empty if no operation has been measured.
+        """
+        return self.obj_instrument.dict_report
 
     def set_path_from_console(self):
         """
@@ -76,20 +125,102 @@ class BibManager:
                                self.path_bib.split('/')[-1] + "\n")
             print("A new bib file has been created at " + self.path_bib)
 
-    def read_bib(self):
+    def read_bib(self, flag_use_cache=False, flag_lazy=False, flag_parallel=False,
+                 int_workers=None):
         """
         readbib reads references items from self.path_bib, and store them in
         a 2D dictionary; if table of contents (metadata) exists, the table of
         contents is also read and stored in a 2D list.
+        If flag_use_cache is True, the parsed library is loaded from the cache
+        file next to the bib file when the bib file is unchanged, and the cache
+        file is rebuilt otherwise.
+        If flag_lazy is True (and no valid cache is used), only the keys and
+        offsets of the references are scanned, and each reference is parsed
+        the first time it is accessed in self.dict_refs. No cache file is
+        written in this mode.
+        If flag_parallel is True (and neither a valid cache nor flag_lazy is
+        used), the bib file is split at entry boundaries and the chunks are
+        parsed by int_workers worker processes (default: the number of
+        processors). The result is the same as that of the serial parser.
+        """
+        with self.obj_instrument.operation('read_bib'):
+            self.__log("Reading the bib file at " + self.path_bib)
+            if flag_use_cache:
+                obj_cache = BibCache(self.path_bib)
+                with self.obj_instrument.phase('load_cache'):
+                    dict_cache = obj_cache.load()
+                if dict_cache is not None:
+                    self.__log("Loading table of contents and references from the cache file...")
+                    obj_tocs = BibTableOfContents()
+                    obj_tocs.create_tocs_from_dict(dict_cache['dict_tocs'])
+                    self.__set_tocs(obj_tocs)
+                    self.__log_tocs()
+                    self.dict_refs.update(dict_cache['dict_refs'])
+                    self.obj_refs_index = BibEntryIndex()
+                    self.obj_refs_index.dict_entries = dict_cache['dict_refs_index']
+                    self.__reset_dirty_tracking()
+                    self.obj_instrument.count('int_entries_loaded', len(dict_cache['dict_refs']))
+                    self.__log("A total of " + str(len(self.dict_refs)) +
+                               " publication(s) have been registered.")
+                    self.__log("Reading completed.")
+                    return
+            str_file_input = self.__return_file_input()
+            self.__log("Reading table of contents from the bib file...")
+            with self.obj_instrument.phase('parse_tocs'):
+                self.__read_tocs_from_bib(str_file_input)
+            if flag_lazy:
+                self.__log("Scanning references from the bib file...")
+                with self.obj_instrument.phase('scan_refs'):
+                    self.__add_refs_from_bib_lazily(str_file_input)
+            else:
+                self.__log("Adding references from the bib file...")
+                with self.obj_instrument.phase('parse_refs'):
+                    self.__add_refs_from_bib(str_file_input, flag_parallel, int_workers)
+            if flag_use_cache and not flag_lazy:
+                with self.obj_instrument.phase('save_cache'):
+                    obj_cache.save({'dict_tocs': self.obj_tocs.dict_tocs,
+                                    'dict_refs': self.dict_refs,
+                                    'dict_refs_index': self.obj_refs_index.dict_entries},
+                                   str_file_input)
+            self.__reset_dirty_tracking()
+            self.__log("A total of " + str(len(self.dict_refs)) +
+                       " publication(s) have been registered.")
+            self.__log("Reading completed.")
+
+    def reload_bib(self):
+        """
+        reload_bib reads self.path_bib again after it has been changed, and
+        parses only the references that are added or modified since the last
+        read. Removed references are deleted from self.dict_refs, which is
+        updated in place. The table of contents is read again.
+        Returns a dictionary with the keys of the 'added', 'removed' and
+        'modified' references.
         """
-        print("Reading the bib file at " + self.path_bib)
-        print("Reading table of contents from the bib file...")
-        self.__read_tocs_from_bib()
-        print("Adding references from the bib file...")
-        self.__add_refs_from_bib()
-        print("A total of " + str(len(self.dict_refs)) +
-              " publication(s) have been registered.")
-        print("Reading completed.")
+        with self.obj_instrument.operation('reload_bib'):
+            self.__log("Reloading the bib file at " + self.path_bib)
+            str_file_input = self.__return_file_input()
+            with self.obj_instrument.phase('parse_tocs'):
+                self.__read_tocs_from_bib(str_file_input)
+            with self.obj_instrument.phase('index_refs'):
+                obj_new_index = BibEntryIndex()
+                obj_new_index.create_index_from_text(str_file_input)
+                if self.obj_refs_index is None:
+                    self.obj_refs_index = BibEntryIndex()
+                lst_added, lst_removed, lst_modified = \
+                    self.obj_refs_index.compare(obj_new_index)
+            with self.obj_instrument.phase('parse_refs'):
+                for iter_item in lst_removed:
+                    self.remove_ref(iter_item)
+                for iter_item in lst_added + lst_modified:
+                    int_start, int_end, _ = obj_new_index.dict_entries[iter_item]
+                    self.add_ref(BibParser.parse_entry(
+                        str_file_input, int_start, int_end))
+                self.obj_instrument.count('int_entries_built', len(lst_added) + len(lst_modified))
+            self.obj_refs_index = obj_new_index
+            self.__log(str(len(lst_added)) + " added, " + str(len(lst_removed)) +
+                       " removed, " + str(len(lst_modified)) + " modified publication(s).")
+            return {'added': lst_added, 'removed': lst_removed,
+                    'modified': lst_modified}
 
     def display_tocs(self):
         """
@@ -97,6 +228,37 @@ class BibManager:
         """
         self.obj_tocs.display_tocs()
 
+    def merge_bibs(self, lst_path_bib, str_policy='keep-first', int_workers=None):
+        """
+        merge_bibs replaces the table of contents and the references with
+        those merged from several bib files, parsed in parallel worker
+        processes (see BibMerger). The tables of contents are united by
+        section path, and references with the same key are resolved by
+        str_policy: 'keep-first', 'keep-newest', 'rename' or 'field-merge'.
+        The key conflicts are printed and returned as a list of
+        (str_id, lst_paths, str_resolution). Use update_bib to write the
+        merged bib file.
+        """
+        with self.obj_instrument.operation('merge_bibs'):
+            self.__log("Merging " + str(len(lst_path_bib)) + " bib file(s)...")
+            with self.obj_instrument.phase('merge_files'):
+                obj_tocs, dict_refs, lst_conflicts = BibMerger(str_policy, int_workers).merge_files(lst_path_bib)
+                self.obj_instrument.count('int_files_read', len(lst_path_bib))
+                self.obj_instrument.count('int_entries_built', len(dict_refs))
+            if not obj_tocs.dict_tocs:
+                obj_tocs.create_tocs_from_multidimensional_list(['Default Section'])
+            self.__set_tocs(obj_tocs)
+            self.__log_tocs()
+            self.dict_refs = dict_refs
+            self.obj_refs_index = None
+            self.__reset_dirty_tracking()
+            for str_id, lst_paths, str_resolution in lst_conflicts:
+                self.__log("Conflict of " + str_id + " in " + ", ".join(lst_paths) + ": " + str_resolution,
+                           logging.WARNING)
+            self.__log("A total of " + str(len(self.dict_refs)) + " publication(s) have been registered, with " +
+                       str(len(lst_conflicts)) + " key conflict(s).")
+            return lst_conflicts
+
     def update_tocs_from_console(self):
         """
         update_tocs_from_console reads the table of contents structure from the
@@ -137,6 +299,55 @@ class BibManager:
         lst_console_inputs = self.__chop_list(lst_console_inputs)
         self.__add_refs(lst_console_inputs)
 
+    def add_ref(self, obj_reference):
+        """
+        add_ref adds a reference to the reference dictionary, replacing the
+        reference with the same key, if any.
+        """
+        if obj_reference.str_id in self.dict_refs:
+            self.mark_ref_dirty(obj_reference.str_id)
+        self.dict_refs[obj_reference.str_id] = obj_reference
+        if self.flag_category_index_complete:
+            self.obj_category_index.add_ref(obj_reference.str_id, obj_reference)
+        if self.obj_search_index is not None:
+            self.obj_search_index.add_ref(obj_reference.str_id, obj_reference)
+        self.mark_ref_dirty(obj_reference.str_id)
+
+    def remove_ref(self, str_id):
+        """
+        remove_ref removes a reference from the reference dictionary.
+        Returns the removed reference, or None if it cannot be found.
+        """
+        if str_id not in self.dict_refs:
+            return None
+        self.mark_ref_dirty(str_id)
+        if self.flag_category_index_complete:
+            self.obj_category_index.remove_ref(str_id)
+        if self.obj_search_index is not None:
+            self.obj_search_index.remove_ref(str_id)
+        return self.dict_refs.pop(str_id)
+
+    def set_catid(self, str_id, hex_catid):
+        """
+        set_catid sets the catid of a reference.
+        """
+        self.mark_ref_dirty(str_id)
+        self.dict_refs[str_id].hex_catid = hex_catid
+        if self.flag_category_index_complete:
+            self.obj_category_index.add_ref(str_id, self.dict_refs[str_id])
+        self.mark_ref_dirty(str_id)
+
+    def mark_ref_dirty(self, str_id):
+        """
+        mark_ref_dirty records that the section of a reference has to be
+        generated again at the next update_bib. add_ref, remove_ref and
+        set_catid call it; call it after editing the fields of a reference in
+        self.dict_refs directly.
+        """
+        self.set_dirty_sections.add(
+            self.obj_category_index.return_section_of_catid(
+                self.dict_refs[str_id].hex_catid))
+
     def update_catid(self, strlst_id: str):
         """
         update_catid updates the catid for one or multiple references, depending
@@ -152,11 +363,68 @@ class BibManager:
             else:
                 self.__update_catid(strlst_id)
         elif isinstance(strlst_id, list):
-            for iter_item in lst_id:
+            for iter_item in strlst_id:
                 _ = self.__update_catid(iter_item)
         else:
             print('It is not clear which reference catid shall be updated.')
 
+    def update_catid_from_rules(self, path_rules, flag_uncategorized_only=True):
+        """
+        update_catid_from_rules assigns catids in bulk from a rules file (see
+        BibCategorizer for the format). The rules are applied in one pass to
+        the uncategorized references (or to all references if
+        flag_uncategorized_only is False); a reference gets a catid only if
+        all the rules it matches agree on it. The matches and conflicts of
+        each rule are printed, and the report of BibCategorizer.categorize is
+        returned. The references left uncategorized can then be handled by
+        update_catid('uncategorized').
+        """
+        self.__update_dict_refs_categorized_if_outdated()
+        obj_categorizer = BibCategorizer()
+        obj_categorizer.create_rules_from_file(path_rules, self.obj_tocs)
+        if flag_uncategorized_only:
+            lst_id = list(self.dict_refs_categorized[-1].keys())
+        else:
+            lst_id = None
+        dict_report = obj_categorizer.categorize(self.dict_refs, lst_id)
+        for iter_key, iter_value in dict_report['dict_assigned'].items():
+            if self.dict_refs[iter_key].hex_catid != iter_value:
+                self.set_catid(iter_key, iter_value)
+        for iter_item in obj_categorizer.return_report_printout(dict_report):
+            self.__log(iter_item)
+        return dict_report
+
+    def update_catid_from_suggestions(self, int_top_k=3, float_threshold=None):
+        """
+        update_catid_from_suggestions ranks the leaf sections for every
+        reference that is not under a leaf section (uncategorized,
+        unrecognized catid or catid not of a leaf section), learned from the
+        references that are (see BibCatidSuggester; requires NumPy). The
+        int_top_k best sections of each reference are printed with their
+        scores between 0 and 1. If float_threshold is given, the best section
+        is set as the catid of each reference whose best score reaches it.
+        Returns the suggestions, the reference key mapped to a list of
+        (hex_catid, float_score).
+        """
+        self.__update_dict_refs_categorized_if_outdated()
+        obj_suggester = BibCatidSuggester()
+        obj_suggester.fit(self.dict_refs, self.obj_tocs.set_leaf_keys)
+        lst_id = [iter_key for iter_section in (-1, -2, -3)
+                  for iter_key in self.dict_refs_categorized[iter_section]]
+        dict_suggestions = obj_suggester.suggest(self.dict_refs, lst_id, int_top_k)
+        int_accepted = 0
+        for iter_key, iter_value in dict_suggestions.items():
+            self.__log(iter_key + ": " + ", ".join(
+                hex(hex_catid) + " (" + format(float_score, '.2f') + ")"
+                for hex_catid, float_score in iter_value))
+            if float_threshold is not None and iter_value and iter_value[0][1] >= float_threshold:
+                self.set_catid(iter_key, iter_value[0][0])
+                int_accepted += 1
+        if float_threshold is not None:
+            self.__log(str(int_accepted) + " of " + str(len(dict_suggestions)) +
+                       " suggestion(s) have been accepted.")
+        return dict_suggestions
+
     def update_dict_refs_categorized(self):
         """
         update_dict_refs_categorized updates self.dict_refs_categorized using
@@ -164,29 +432,99 @@ class BibManager:
         The keys of self.dict_refs_categorized are the leafs of the table of
         contents. Uncategorized/Wrongly categorized refs are put into separate
         categories.
+        The category index is rebuilt from all the references; afterwards it
+        is kept up to date by add_ref, remove_ref and set_catid.
         """
-        self.dict_refs_categorized = {}
-        lst_tocs_all_keys = self.obj_tocs.return_tocs_all_keys()
-        lst_tocs_leaf_keys = self.obj_tocs.return_tocs_leaf_keys()
-        self.dict_refs_categorized[-1] = {}  # Refs uncategorized
-        self.dict_refs_categorized[-2] = {}  # Refs with unrecognized catid
-        self.dict_refs_categorized[-3] = {}  # Refs categorized not under leaf
-        if lst_tocs_leaf_keys is not None:
-            for iter_item in lst_tocs_all_keys:
-                self.dict_refs_categorized[iter_item] = {}
-            for iter_key, iter_value in self.dict_refs.items():
-                if iter_value.hex_catid is None:
-                    self.dict_refs_categorized[-1][iter_key] = iter_value
-                elif iter_value.hex_catid not in lst_tocs_all_keys:
-                    self.dict_refs_categorized[-2][iter_key] = iter_value
-                elif iter_value.hex_catid not in lst_tocs_leaf_keys:
-                    self.dict_refs_categorized[-3][iter_key] = iter_value
-                else:
-                    self.dict_refs_categorized[iter_value.hex_catid][iter_key] = iter_value
+        with self.obj_instrument.operation('update_dict_refs_categorized'):
+            with self.obj_instrument.phase('categorize'):
+                self.obj_category_index = BibCategoryIndex(self.obj_tocs)
+                self.obj_category_index.create_index_from_refs(self.dict_refs)
+                self.obj_instrument.count('int_entries_categorized', len(self.dict_refs))
+            self.dict_refs_categorized = self.obj_category_index.dict_sections
+            self.flag_category_index_complete = True
+            if not self.obj_category_index.set_tocs_keys:
+                self.__log("Table of contents needs to be defined before categorization.",
+                           logging.WARNING)
+
+    def return_refs_in_section(self, hex_section, flag_descendants=True):
+        """
+        return_refs_in_section returns the references in a section of the
+        table of contents (or in one of the special categories -1, -2, -3),
+        including the references in its subsections if flag_descendants is
+        True.
+        """
+        self.__update_dict_refs_categorized_if_outdated()
+        return self.obj_category_index.return_refs_in_section(
+            hex_section, flag_descendants)
+
+    def search_refs(self, str_query, int_limit=None):
+        """
+        search_refs searches the references by title, author, journal and
+        year, e.g. "author:abur state estimat* year:2000..2010" (see
+        BibSearchIndex for the query syntax). Returns (str_id, float_score)
+        of the matching references, best match first.
+        The search index is built at the first search and then kept up to
+        date by add_ref and remove_ref; call add_ref again after editing the
+        fields of a reference in self.dict_refs directly.
+        """
+        if self.obj_search_index is None or len(self.obj_search_index) != len(self.dict_refs):
+            self.obj_search_index = BibSearchIndex()
+            self.obj_search_index.create_index_from_refs(self.dict_refs)
+        return self.obj_search_index.search(str_query, int_limit)
+
+    def replace_in_refs(self, path_rules, flag_dry_run=True):
+        """
+        replace_in_refs applies a table of search-and-replace rules to the
+        fields of all the references (see BibReplacer for the format), e.g.
+        "title: /\\bGUI\\b/ => {GUI}" or "journal: Systems => Syst.". The
+        hits of each rule are printed; if flag_dry_run is True (default), the
+        changes are printed as a diff and the references are left unchanged.
+        Returns the report of BibReplacer.replace.
+        """
+        obj_replacer = BibReplacer()
+        obj_replacer.create_rules_from_file(path_rules)
+        dict_report = obj_replacer.replace(self.dict_refs, flag_dry_run)
+        if flag_dry_run:
+            for iter_item in obj_replacer.return_diff_printout(dict_report):
+                self.__log(iter_item)
         else:
-            print("Table of contents needs to be defined before categorization.")
+            for iter_key in dict_report['dict_changes']:
+                self.add_ref(self.dict_refs[iter_key])
+        for iter_item in obj_replacer.return_report_printout(dict_report):
+            self.__log(iter_item)
+        return dict_report
+
+    def find_duplicates(self, float_threshold=0.8, flag_merge=False):
+        """
+        find_duplicates finds the clusters of near-duplicate references, i.e.
+        references whose normalized titles and author surnames have a Jaccard
+        similarity of at least float_threshold (see BibDuplicateFinder), and
+        prints them with the similarity of each pair. If flag_merge is True,
+        each cluster is merged into the reference with the most fields, whose
+        missing fields are filled in from the others, and the others are
+        removed. Returns the clusters.
+        """
+        lst_clusters = BibDuplicateFinder().find_duplicates(self.dict_refs, float_threshold)
+        for iter_index, dict_cluster in enumerate(lst_clusters):
+            self.__log("Cluster " + str(iter_index + 1) + ": " + ", ".join(dict_cluster['lst_ids']))
+            for str_id_a, str_id_b, float_similarity in dict_cluster['lst_pairs']:
+                self.__log("    " + str_id_a + " ~ " + str_id_b + ": " + format(float_similarity, '.2f'))
+        self.__log(str(len(lst_clusters)) + " cluster(s) of duplicate references have been found.")
+        if flag_merge:
+            int_removed = 0
+            for dict_cluster in lst_clusters:
+                obj_kept = BibDuplicateFinder.merge_references(
+                    [self.dict_refs[iter_item] for iter_item in dict_cluster['lst_ids']])
+                for iter_item in dict_cluster['lst_ids']:
+                    if iter_item != obj_kept.str_id:
+                        self.remove_ref(iter_item)
+                        int_removed += 1
+                self.add_ref(obj_kept)
+            self.__log(str(int_removed) + " duplicate reference(s) have been merged.")
+        return lst_clusters
 
-    def update_bib(self, path_output_bib='default', str_author_name=AUTHOR_NAME):
+    def update_bib(self, path_output_bib='default', str_author_name=AUTHOR_NAME,
+                   flag_confirm=True):
         """
         update_bib updates the bib file, including:
         - print the path to the updated bib file (by default the same path as
@@ -195,135 +533,157 @@ class BibManager:
         - print table of content in the bib file;
         - (optional, by default) sort the references;
         - print references in the bib file.
+        The bib file is generated section by section in memory, written to a
+        temporary file and renamed to the target path, so an interrupted
+        update never leaves a truncated bib file. If flag_confirm is False,
+        the bib file is written without asking for confirmation.
         """
-        self.update_dict_refs_categorized()
-        if path_output_bib == 'default':
-            path_output_bib = self.path_bib
-        print("The updated bib file will be stored at " + path_output_bib)
-        if os.path.isfile(path_output_bib):
-            print(
-                "Warning: This path points to an existing file. The file will be over written.")
-        if self.__ask_yes_no("Do you want to continue with the path?"):
-            self.path_bib = path_output_bib
-            print("Updating bib file...")
-            with open(self.path_bib, 'w') as file_bib:
-                # name
-                file_bib.write("%% - Name of bib file: " +
-                               self.path_bib.split('/')[-1] + "\n")
-                # time
-                str_print = "%% - Latest updated time: " + \
-                    datetime.now().strftime("%B %d, %Y %H:%M:%S")
-                file_bib.write(str_print + "\n")
-                print(str_print)
-                # author
-                str_print = "%% - Updated by: " + str_author_name
-                file_bib.write(str_print + "\n")
-                print(str_print)
-                # table of Contents
-                if self.obj_tocs is None:
-                    str_print = "%% - Table of Contents: None"
-                    file_bib.write(str_print + "\n")
-                else:
-                    str_list = "%% - Table of Contents"
-                    file_bib.write(str_list + "\n")
-                    lst_print = self.obj_tocs.return_tocs_printout()
-                    for iter_item in lst_print:
-                        str_list = "%% - > " + iter_item
-                        file_bib.write(str_list + "\n")
-                    str_print = "%% - End of Table of Contents"
-                    file_bib.write(str_print + "\n")
-                    file_bib.write("\n")
-                # references
-                lst_tocs_print = list(self.dict_refs_categorized.keys())
-                lst_tocs_print.sort()
-                for iter_item in lst_tocs_print:
-                    if iter_item > 0:
-                        file_bib.write("\n")
-                        file_bib.write("%% - " + hex(iter_item) + " " +
-                                       self.obj_tocs.dict_tocs[iter_item] + "\n")
-                        lst_tocs_sublayer_print = list(
-                            self.dict_refs_categorized[iter_item])
-                        lst_tocs_sublayer_print.sort()
-                        for iter_item_sublayer in lst_tocs_sublayer_print:
-                            lst_print = self.dict_refs_categorized[iter_item][iter_item_sublayer].return_refs_printout(
-                            )
-                            file_bib.write("\n")
-                            for str_print in lst_print:
-                                file_bib.write(str_print + "\n")
-                file_bib.write("\n")
-                file_bib.write("%% - " + "Uncategorized references" + "\n")
-                lst_tocs_sublayer_print = list(self.dict_refs_categorized[-1])
-                lst_tocs_sublayer_print.sort()
-                for iter_item_sublayer in lst_tocs_sublayer_print:
-                    lst_print = self.dict_refs_categorized[-1][iter_item_sublayer].return_refs_printout(
-                    )
-                    file_bib.write("\n")
-                    for str_print in lst_print:
-                        file_bib.write(str_print + "\n")
-                file_bib.write("\n")
-                file_bib.write(
-                    "%% - " + "References categorized not under leaf" + "\n")
-                lst_tocs_sublayer_print = list(self.dict_refs_categorized[-3])
-                lst_tocs_sublayer_print.sort()
-                for iter_item_sublayer in lst_tocs_sublayer_print:
-                    lst_print = self.dict_refs_categorized[-3][iter_item_sublayer].return_refs_printout(
-                    )
-                    file_bib.write("\n")
-                    for str_print in lst_print:
-                        file_bib.write(str_print + "\n")
-                file_bib.write("\n")
-                file_bib.write("%% - " + "Unrecoganized catid" + "\n")
-                lst_tocs_sublayer_print = list(self.dict_refs_categorized[-2])
-                lst_tocs_sublayer_print.sort()
-                for iter_item_sublayer in lst_tocs_sublayer_print:
-                    lst_print = self.dict_refs_categorized[-2][iter_item_sublayer].return_refs_printout(
-                    )
-                    file_bib.write("\n")
-                    for str_print in lst_print:
-                        file_bib.write(str_print + "\n")
-        else:
-            print("Abort. The bib file is not updated.")
+        with self.obj_instrument.operation('update_bib'):
+            self.__update_dict_refs_categorized_if_outdated()
+            if path_output_bib == 'default':
+                path_output_bib = self.path_bib
+            self.__log("The updated bib file will be stored at " + path_output_bib)
+            if flag_confirm and os.path.isfile(path_output_bib):
+                print(
+                    "Warning: This path points to an existing file. The file will be over written.")
+            if (not flag_confirm) or self.__ask_yes_no("Do you want to continue with the path?"):
+                self.path_bib = path_output_bib
+                self.__log("Updating bib file...")
+                str_header = BibWriter.return_header_printout(
+                    self.path_bib, str_author_name, self.obj_tocs)
+                self.__log(str_header.split('\n')[1])
+                self.__log(str_header.split('\n')[2])
+                str_file_input = self.__return_written_bib_if_unchanged()
+                lst_blocks = [str_header]
+                dict_written_sections = {}
+                int_offset = len(str_header)
+                int_regenerated = 0
+                with self.obj_instrument.phase('render'):
+                    for iter_item in BibWriter.return_section_keys(self.dict_refs_categorized):
+                        tuple_written = self.dict_written_sections.get(iter_item)
+                        if str_file_input is not None and tuple_written is not None and \
+                                iter_item not in self.set_dirty_sections and \
+                                tuple_written[2] == len(self.dict_refs_categorized[iter_item]):
+                            # unchanged section; reuse its text in the existing file
+                            str_block = str_file_input[tuple_written[0]:tuple_written[1]]
+                        else:
+                            str_block = BibWriter.return_section_printout(
+                                iter_item, self.dict_refs_categorized[iter_item], self.obj_tocs)
+                            int_regenerated += 1
+                        lst_blocks.append(str_block)
+                        dict_written_sections[iter_item] = (
+                            int_offset, int_offset + len(str_block),
+                            len(self.dict_refs_categorized[iter_item]))
+                        int_offset += len(str_block)
+                    self.obj_instrument.count('int_sections_generated', int_regenerated)
+                    self.obj_instrument.count('int_sections_reused', len(lst_blocks) - 1 - int_regenerated)
+                with self.obj_instrument.phase('write'):
+                    BibWriter.write_atomically(self.path_bib, lst_blocks)
+                    self.obj_instrument.count('int_bytes_written', os.path.getsize(self.path_bib))
+                self.__log(str(int_regenerated) + " of " + str(len(lst_blocks) - 1) +
+                           " section(s) have been generated.")
+                self.dict_written_sections = dict_written_sections
+                self.tuple_written_stamp = self.__return_file_stamp(self.path_bib)
+                self.set_dirty_sections = set()
+                self.flag_tocs_dirty = False
+            else:
+                self.__log("Abort. The bib file is not updated.", logging.WARNING)
+
+    def __update_dict_refs_categorized_if_outdated(self):
+        # the category index misses references added to or removed from
+        # self.dict_refs directly; a differing count reveals that
+        if not self.flag_category_index_complete or \
+                len(self.obj_category_index.dict_ref_sections) != len(self.dict_refs):
+            self.update_dict_refs_categorized()
+
+    def __reset_dirty_tracking(self):
+        self.flag_category_index_complete = False
+        self.obj_search_index = None
+        self.set_dirty_sections = set()
+        self.flag_tocs_dirty = False
+        self.dict_written_sections = {}
+        self.tuple_written_stamp = None
 
-    def __read_tocs_from_bib(self):
+    def __return_written_bib_if_unchanged(self):
+        # the text of the bib file written by the last update_bib, if the
+        # sections in it can be reused, or None
+        if self.flag_tocs_dirty or not self.dict_written_sections or \
+                self.tuple_written_stamp is None or \
+                self.tuple_written_stamp != self.__return_file_stamp(self.path_bib):
+            return None
         with open(self.path_bib, 'r') as file_bib:
-            lst_file_inputs = file_bib.readlines()
-            lst_file_inputs = [str_fileinput.strip()
-                               for str_fileinput in lst_file_inputs]
-        flag_detect_tocs = False
-        lst_text = []
-        for iter_item in lst_file_inputs:
-            if iter_item == "%% - Table of Contents":
-                flag_detect_tocs = True
-                continue
-            if iter_item == "%% - End of Table of Contents":
-                break
-            if flag_detect_tocs:
-                lst_text.append(iter_item[7:])
-        if flag_detect_tocs:
+            return file_bib.read()
+
+    @staticmethod
+    def __return_file_stamp(path_bib):
+        if not os.path.isfile(path_bib):
+            return None
+        obj_stat = os.stat(path_bib)
+        return (os.path.abspath(path_bib), obj_stat.st_size, obj_stat.st_mtime_ns)
+
+    def __log(self, str_message, int_level=logging.INFO):
+        if self.flag_quiet and int_level < logging.WARNING:
+            return
+        LOGGER.log(int_level, str_message)
+
+    def __log_tocs(self):
+        # the full table of contents is a debug message
+        if not self.flag_quiet and LOGGER.isEnabledFor(logging.DEBUG):
+            for iter_item in self.obj_tocs.return_tocs_index_printout():
+                LOGGER.debug(iter_item)
+
+    def __return_file_input(self):
+        with self.obj_instrument.phase('read_file'):
+            with open(self.path_bib, 'r') as file_bib:
+                str_file_input = file_bib.read()
+            self.obj_instrument.count('int_bytes_read', os.path.getsize(self.path_bib))
+            if self.obj_instrument.flag_enabled:
+                self.obj_instrument.count('int_lines_scanned', str_file_input.count('\n') + 1)
+        return str_file_input
+
+    def __read_tocs_from_bib(self, str_file_input):
+        lst_text = BibParser.parse_tocs(str_file_input)
+        if lst_text is not None:
             self.__update_tocs(lst_text)
-            print("The following table of contents has been created.")
-            self.display_tocs()
+            self.__log("A table of contents of " + str(len(self.obj_tocs.dict_tocs)) +
+                       " section(s) has been created.")
         else:
-            print("Table of contents is not detected from the bib file.", end="")
-            print("A default table of contents has been created.")
-            self.obj_tocs = BibTableOfContents()
-            self.obj_tocs.create_tocs_from_multidimensional_list(
+            self.__log("Table of contents is not detected from the bib file. " +
+                       "A default table of contents has been created.")
+            obj_tocs = BibTableOfContents()
+            obj_tocs.create_tocs_from_multidimensional_list(
                 ['Default Section'])
-            self.display_tocs()
+            self.__set_tocs(obj_tocs)
+        self.__log_tocs()
 
-    def __add_refs_from_bib(self):
-        with open(self.path_bib, 'r') as file_bib:
-            lst_file_inputs = file_bib.readlines()
-            lst_file_inputs = [str_fileinput.strip()
-                               for str_fileinput in lst_file_inputs]
-        self.__add_refs(lst_file_inputs)
+    def __add_refs_from_bib(self, str_file_input, flag_parallel=False, int_workers=None):
+        lst_spans = []
+        if flag_parallel:
+            lst_refs = BibParser.parse_text_in_parallel(str_file_input, int_workers, lst_spans)
+        else:
+            lst_refs = BibParser.parse_text(str_file_input, lst_spans=lst_spans)
+        for obj_reference in lst_refs:
+            self.dict_refs[obj_reference.str_id] = obj_reference
+        self.obj_instrument.count('int_entries_built', len(lst_refs))
+        self.obj_refs_index = BibEntryIndex()
+        self.obj_refs_index.create_index_from_spans(str_file_input, lst_spans)
+
+    def __add_refs_from_bib_lazily(self, str_file_input):
+        dict_refs = BibLazyReferenceDict.create_from_text(str_file_input)
+        self.obj_instrument.count('int_entries_scanned', len(dict_refs))
+        for iter_key, iter_value in self.dict_refs.items():
+            if iter_key not in dict_refs:
+                dict_refs[iter_key] = iter_value
+        self.dict_refs = dict_refs
+        # without content hashes, reload_bib parses all references again
+        self.obj_refs_index = None
 
     def __update_catid(self, str_id):
         if str_id in self.dict_refs:
             str_catid = input(
                 "Please key in the catid for reference " + str_id + ": 0x")
             try:
-                self.dict_refs[str_id].hex_catid = int(str_catid, 16)
+                self.set_catid(str_id, int(str_catid, 16))
                 return True
             except:
                 return False
@@ -331,78 +691,20 @@ class BibManager:
         return False
 
     def __update_tocs(self, lst_text):
-        self.obj_tocs = BibTableOfContents()
-        self.obj_tocs.create_tocs_from_space_list(lst_text)
+        obj_tocs = BibTableOfContents()
+        obj_tocs.create_tocs_from_space_list(lst_text)
+        self.__set_tocs(obj_tocs)
+
+    def __set_tocs(self, obj_tocs):
+        if self.obj_tocs is None or self.obj_tocs.dict_tocs != obj_tocs.dict_tocs:
+            self.flag_tocs_dirty = True
+        self.obj_tocs = obj_tocs
+        self.obj_category_index = BibCategoryIndex(obj_tocs)
+        self.flag_category_index_complete = False
 
     def __add_refs(self, lst_text):
-        for iter_item in lst_text:
-            if len(iter_item) > 0:
-                # type and id
-                lst_keyinfo = re.findall('@.*{', iter_item)
-                if len(lst_keyinfo) > 0:
-                    obj_reference = BibReference()
-                    obj_reference.str_type = lst_keyinfo[0][1:-1].lower()
-                    if obj_reference.str_type == 'book':
-                        obj_reference.enum_type = PublicationType(1)
-                    elif obj_reference.str_type == 'article':
-                        obj_reference.enum_type = PublicationType(2)
-                    elif obj_reference.str_type == 'inproceedings':
-                        obj_reference.enum_type = PublicationType(3)
-                    elif obj_reference.str_type == 'online':
-                        obj_reference.enum_type = PublicationType(4)
-                    else:
-                        obj_reference.enum_type = PublicationType(5)
-                lst_keyinfo = re.findall('@.*{.*,', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*,', lst_keyinfo[0])
-                    obj_reference.str_id = lst_keyinfo[0][1:-1]
-                # title
-                lst_keyinfo = re.findall('title ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_title = lst_keyinfo[0][1:-1]
-                # author
-                lst_keyinfo = re.findall('author ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_author = lst_keyinfo[0][1:-1]
-                # journal
-                lst_keyinfo = re.findall('journal ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_journal = lst_keyinfo[0][1:-1]
-                # volume
-                lst_keyinfo = re.findall('volume ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_volume = lst_keyinfo[0][1:-1]
-                # number
-                lst_keyinfo = re.findall('number ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_number = lst_keyinfo[0][1:-1]
-                # pages
-                lst_keyinfo = re.findall('pages ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_pages = lst_keyinfo[0][1:-1]
-                # year
-                lst_keyinfo = re.findall('year ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_year = lst_keyinfo[0][1:-1]
-                # publisher
-                lst_keyinfo = re.findall('publisher ?= ?{.*}', iter_item)
-                if len(lst_keyinfo) > 0:
-                    lst_keyinfo = re.findall('{.*}', lst_keyinfo[0])
-                    obj_reference.str_publisher = lst_keyinfo[0][1:-1]
-                # end of reference / hex_catid
-                if iter_item[0] == '}':
-                    lst_keyinfo = re.findall(r'% catid = 0x\d{8}', iter_item)
-                    if len(lst_keyinfo) > 0:
-                        lst_keyinfo = re.findall(r'0x\d{8}', lst_keyinfo[0])
-                        obj_reference.hex_catid = int(lst_keyinfo[0], 0)
-                    self.dict_refs[obj_reference.str_id] = obj_reference
+        for obj_reference in BibParser.parse_text('\n'.join(lst_text)):
+            self.add_ref(obj_reference)
 
     @staticmethod
     def __ask_yes_no(str_message):
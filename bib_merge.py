@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibMerger combines several bib files into one library: the files are
+parsed in parallel worker processes, their tables of contents are united by
+section path and the references with the same key are resolved by a policy.
+
+Usage:
+    python bib_merge.py output.bib input1.bib input2.bib [...]
+        [--policy keep-first|keep-newest|rename|field-merge] [--workers N]
+@author: github.com/sunluelectric
+"""
+
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from bib_parser import BibParser, DICT_FIELD_ATTRIBUTE
+from bib_table_of_contents import BibTableOfContents
+from self_error import GeneralErrorMessage
+
+LST_POLICIES = ['keep-first', 'keep-newest', 'rename', 'field-merge']
+
+
+def return_parsed_bib(path_bib: str):
+    """
+    return_parsed_bib reads and parses a bib file. It runs in a worker
+    process, so it returns plain data: the dict_tocs of the table of contents
+    (None if the file has none), the list of BibReference and the
+    modification time of the file.
+    """
+    with open(path_bib, 'r') as file_bib:
+        str_file_input = file_bib.read()
+    lst_text = BibParser.parse_tocs(str_file_input)
+    dict_tocs = None
+    if lst_text is not None:
+        obj_tocs = BibTableOfContents()
+        obj_tocs.create_tocs_from_space_list(lst_text)
+        dict_tocs = obj_tocs.dict_tocs
+    return dict_tocs, BibParser.parse_text(str_file_input), os.path.getmtime(path_bib)
+
+
+class BibMerger:
+    """
+    Class BibMerger merges bib files.
+
+    The table of contents of the result has every section path (the names of
+    a section and of its ancestors) found in any file, in the order of first
+    appearance, and the catid of each reference is mapped to the section with
+    the same path. A catid that is not a section of its own file is dropped.
+
+    References with the same key in several files are resolved by the policy:
+    - 'keep-first': the reference of the first file is kept;
+    - 'keep-newest': the reference of the most recently modified file is kept;
+    - 'rename': all the references are kept, the later ones under the key
+    with a suffix "_2", "_3", ...;
+    - 'field-merge': the reference of the first file is kept, and its missing
+    fields and catid are filled in from the later ones.
+    References that are equal in every field are not reported as conflicts.
+    """
+
+    def __init__(self, str_policy: str = 'keep-first', int_workers: int = None):
+        """
+        Initializes a new instance of the BibMerger class.
+
+        Parameters:
+            str_policy (str): The key conflict policy, one of LST_POLICIES.
+            int_workers (int): The number of worker processes (default: the
+            number of processors); 1 parses the files in this process.
+        """
+        if str_policy not in LST_POLICIES:
+            raise GeneralErrorMessage(
+                "Unknown conflict policy " + str_policy + "; use one of " + ", ".join(LST_POLICIES) + ".")
+        self.str_policy = str_policy
+        self.int_workers = int_workers
+
+    def merge_files(self, lst_paths: list):
+        """
+        Parses and merges bib files.
+
+        Parameters:
+            lst_paths (list): The paths to the bib files, in order of priority.
+
+        Returns:
+            tuple: The merged BibTableOfContents, the merged references (key:
+            reference id, value: BibReference) and the list of conflicts, each
+            a tuple (str_id, lst_paths, str_resolution).
+        """
+        if self.int_workers == 1 or len(lst_paths) <= 1:
+            lst_parsed = [return_parsed_bib(iter_item) for iter_item in lst_paths]
+        else:
+            with ProcessPoolExecutor(max_workers=self.int_workers) as obj_executor:
+                lst_parsed = list(obj_executor.map(return_parsed_bib, lst_paths))
+        obj_tocs, lst_catid_maps = self.merge_tocs([iter_item[0] for iter_item in lst_parsed])
+        lst_sources = []  # (path, mtime, list of BibReference) with mapped catids
+        for iter_index, (_, lst_refs, float_mtime) in enumerate(lst_parsed):
+            for obj_reference in lst_refs:
+                obj_reference.hex_catid = lst_catid_maps[iter_index].get(obj_reference.hex_catid)
+            lst_sources.append((lst_paths[iter_index], float_mtime, lst_refs))
+        dict_refs, lst_conflicts = self.__merge_refs(lst_sources)
+        return obj_tocs, dict_refs, lst_conflicts
+
+    @staticmethod
+    def merge_tocs(lst_dict_tocs: list):
+        """
+        Unites tables of contents by section path.
+
+        Parameters:
+            lst_dict_tocs (list): The dict_tocs of each file, or None.
+
+        Returns:
+            tuple: The merged BibTableOfContents, and for each file a
+            dictionary mapping its section indexes to the merged ones.
+        """
+        dict_tree = {}  # key: section name, value: subtree; in order of appearance
+        lst_tocs = []
+        for dict_tocs in lst_dict_tocs:
+            obj_tocs = BibTableOfContents()
+            obj_tocs.create_tocs_from_dict(dict_tocs or {})
+            lst_tocs.append(obj_tocs)
+            for iter_key in obj_tocs.lst_sorted_keys:
+                dict_subtree = dict_tree
+                for str_name in obj_tocs.return_section_path(iter_key):
+                    dict_subtree = dict_subtree.setdefault(str_name, {})
+        lst_text = BibMerger.__return_space_list(dict_tree, 0)
+        obj_merged = BibTableOfContents()
+        obj_merged.create_tocs_from_space_list(lst_text)
+        dict_path_keys = {tuple(obj_merged.return_section_path(iter_key)): iter_key
+                          for iter_key in obj_merged.lst_sorted_keys}
+        lst_catid_maps = [{iter_key: dict_path_keys[tuple(obj_tocs.return_section_path(iter_key))]
+                           for iter_key in obj_tocs.lst_sorted_keys}
+                          for obj_tocs in lst_tocs]
+        return obj_merged, lst_catid_maps
+
+    @staticmethod
+    def __return_space_list(dict_tree: dict, int_layer: int):
+        """
+        Returns a tree of section names as a list of sections with 4 spaces
+        per subsection layer.
+        """
+        lst_text = []
+        for str_name, dict_subtree in dict_tree.items():
+            lst_text.append('    ' * int_layer + str_name)
+            lst_text.extend(BibMerger.__return_space_list(dict_subtree, int_layer + 1))
+        return lst_text
+
+    def __merge_refs(self, lst_sources: list):
+        """
+        Merges the references of the files, resolving the key conflicts.
+        """
+        set_all_keys = {obj_reference.str_id for _, _, lst_refs in lst_sources
+                        for obj_reference in lst_refs}
+        dict_refs = {}
+        dict_ref_sources = {}  # key: reference id, value: (path, mtime) of the kept reference
+        dict_conflicts = {}  # key: original reference id, value: [paths, resolution]
+        for path_bib, float_mtime, lst_refs in lst_sources:
+            for obj_reference in lst_refs:
+                str_id = obj_reference.str_id
+                obj_kept = dict_refs.get(str_id)
+                if obj_kept is None:
+                    dict_refs[str_id] = obj_reference
+                    dict_ref_sources[str_id] = (path_bib, float_mtime)
+                    continue
+                if obj_kept == obj_reference:
+                    continue
+                lst_conflict = dict_conflicts.setdefault(str_id, [[dict_ref_sources[str_id][0]], ''])
+                lst_conflict[0].append(path_bib)
+                if self.str_policy == 'keep-first':
+                    lst_conflict[1] = "kept from " + dict_ref_sources[str_id][0]
+                elif self.str_policy == 'keep-newest':
+                    if float_mtime > dict_ref_sources[str_id][1]:
+                        dict_refs[str_id] = obj_reference
+                        dict_ref_sources[str_id] = (path_bib, float_mtime)
+                    lst_conflict[1] = "kept from " + dict_ref_sources[str_id][0]
+                elif self.str_policy == 'rename':
+                    int_suffix = 2
+                    while str_id + '_' + str(int_suffix) in set_all_keys:
+                        int_suffix += 1
+                    obj_reference.str_id = str_id + '_' + str(int_suffix)
+                    set_all_keys.add(obj_reference.str_id)
+                    dict_refs[obj_reference.str_id] = obj_reference
+                    dict_ref_sources[obj_reference.str_id] = (path_bib, float_mtime)
+                    lst_conflict[1] = (lst_conflict[1] + ", " if lst_conflict[1] else "renamed to ") + \
+                        obj_reference.str_id
+                else:
+                    lst_different = []
+                    for str_attribute in list(DICT_FIELD_ATTRIBUTE.values()) + ['str_type', 'hex_catid']:
+                        obj_value = getattr(obj_reference, str_attribute)
+                        if getattr(obj_kept, str_attribute) is None:
+                            setattr(obj_kept, str_attribute, obj_value)
+                        elif obj_value is not None and obj_value != getattr(obj_kept, str_attribute):
+                            lst_different.append(str_attribute[4:] if str_attribute != 'hex_catid'
+                                                 else 'catid')
+                    lst_conflict[1] = "merged" + (
+                        "; kept differing " + ", ".join(lst_different) + " from " +
+                        dict_ref_sources[str_id][0] if lst_different else "")
+        lst_conflicts = [(iter_key, iter_value[0], iter_value[1])
+                         for iter_key, iter_value in dict_conflicts.items()]
+        return dict_refs, lst_conflicts
+
+
+def main(lst_args=None):
+    """
+    main merges the bib files given on the command line into one bib file.
+    """
+    from bib_manager import BibManager
+    obj_parser = argparse.ArgumentParser(
+        description="Merge bib files into one bib file with a united table of contents.")
+    obj_parser.add_argument('output', help="path to the merged bib file")
+    obj_parser.add_argument('inputs', nargs='+', help="paths to the bib files, in order of priority")
+    obj_parser.add_argument('--policy', choices=LST_POLICIES, default='keep-first',
+                            help="resolution of references with the same key")
+    obj_parser.add_argument('--workers', type=int, default=None,
+                            help="number of worker processes")
+    obj_args = obj_parser.parse_args(lst_args)
+    obj_bib_manager = BibManager()
+    obj_bib_manager.merge_bibs(obj_args.inputs, obj_args.policy, obj_args.workers)
+    obj_bib_manager.update_bib(obj_args.output, flag_confirm=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
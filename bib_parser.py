@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibParser is a single-pass, brace-aware parser that converts the text of
+a bib file into BibReference objects.
+@author: github.com/sunluelectric
+"""
+
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from bib_reference import PublicationType, BibReference
+
+# entry header, e.g. "@article{sun2020robust,"
+RE_ENTRY_HEADER = re.compile(r'^[ \t]*@[ \t]*(\w+)[ \t]*\{[ \t]*([^,\s{}]*)[ \t]*,?',
+                             re.MULTILINE)
+# any brace; used to track the brace depth
+RE_BRACE = re.compile(r'[{}]')
+# brace or double quote; used to find the end of a quoted value
+RE_BRACE_QUOTE = re.compile(r'(?<!\\)"|[{}]')
+# field with at most two levels of nested braces in its value, e.g. "  title     = {Robust control},"
+RE_FIELD_SIMPLE = re.compile(
+    r'[\s,]*+([\w\-:.]++)\s*+=\s*+(?:\{((?:[^{}]++|\{(?:[^{}]++|\{[^{}]*+\})*+\})*+)\}'
+    r'|"((?:[^"{}]++|\{(?:[^{}]++|\{[^{}]*+\})*+\})*+)"|([^,}\s"{]++))')
+# entry body made of fields matched by RE_FIELD_SIMPLE only, up to and
+# including the closing brace of the entry
+RE_ENTRY_SIMPLE = re.compile(
+    r'(?:[\s,]*+[\w\-:.]++\s*+=\s*+(?:\{(?:[^{}]++|\{(?:[^{}]++|\{[^{}]*+\})*+\})*+\}'
+    r'|"(?:[^"{}]++|\{(?:[^{}]++|\{[^{}]*+\})*+\})*+"|[^,}\s"{]++))*+[\s,]*+\}')
+# closing brace of an entry
+RE_ENTRY_CLOSE = re.compile(r'[\s,]*\}')
+# field name followed by "=", e.g. "  title     = "
+RE_FIELD_NAME = re.compile(r'[\s,]*([\w\-:.]+)\s*=\s*')
+# line break inside a multi-line value
+RE_LINE_BREAK = re.compile(r'[ \t]*\r?\n\s*')
+# first and last line of the table of contents block
+RE_TOCS_BEGIN = re.compile(r'^[ \t]*%% - Table of Contents[ \t]*$', re.MULTILINE)
+STR_TOCS_END = "%% - End of Table of Contents"
+# hex_catid stamp after the closing brace, e.g. "} % catid = 0x13200000"
+RE_CATID = re.compile(r'[ \t]*%[ \t]*catid[ \t]*=[ \t]*(0x[0-9a-fA-F]+)')
+
+DICT_PUBLICATION_TYPE = {
+    'book': PublicationType.BOOK,
+    'article': PublicationType.ARTICLE,
+    'inproceedings': PublicationType.INPROCEEDINGS,
+    'online': PublicationType.ONLINE,
+}
+
+DICT_FIELD_ATTRIBUTE = {
+    'title': 'str_title',
+    'author': 'str_author',
+    'journal': 'str_journal',
+    'volume': 'str_volume',
+    'number': 'str_number',
+    'pages': 'str_pages',
+    'year': 'str_year',
+    'publisher': 'str_publisher',
+    'booktitle': 'str_booktitle',
+    'organization': 'str_organization',
+    'url': 'str_url',
+    'urldate': 'str_urldate',
+}
+
+# attributes whose values repeat across references, e.g. journal names; they
+# are interned so that equal values share one string object
+SET_INTERNED_ATTRIBUTES = {'str_journal', 'str_volume', 'str_number',
+                           'str_year', 'str_publisher', 'str_booktitle',
+                           'str_organization', 'str_urldate'}
+
+
+class BibParser:
+    """
+    Class BibParser parses the text of a bib file in a single pass.
+
+    Entry headers are located with one compiled regular expression. The fields
+    of an entry are read with a single findall when the nesting of braces is
+    shallow, otherwise the brace depth is tracked field by field. Hence values
+    that span multiple lines or contain nested braces are read correctly.
+    """
+
+    @staticmethod
+    def scan_entries(str_text: str, int_start: int = 0, int_end: int = None):
+        """
+        Scans the text for entries without parsing their fields.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+            int_start (int): The offset where scanning starts.
+            int_end (int): The offset where scanning stops (default: end of text).
+
+        Yields:
+            tuple: (str_type, str_id, int_entry_start, int_entry_end, int_body_start)
+            where str_text[int_entry_start:int_entry_end] covers the entry from
+            "@" to the end of its closing line (including the catid stamp), and
+            int_body_start is the offset right after the entry key.
+        """
+        if int_end is None:
+            int_end = len(str_text)
+        int_pos = int_start
+        while True:
+            obj_match = RE_ENTRY_HEADER.search(str_text, int_pos, int_end)
+            if obj_match is None:
+                return
+            obj_body = RE_ENTRY_SIMPLE.match(str_text, obj_match.end())
+            if obj_body is not None:
+                int_close = obj_body.end() - 1
+            else:
+                int_close = BibParser.__walk_fields(
+                    str_text, obj_match.end(), None)
+            if int_close < 0:
+                # unterminated entry, which is ignored
+                return
+            int_line_end = str_text.find('\n', int_close)
+            if int_line_end < 0:
+                int_line_end = len(str_text)
+            yield (obj_match.group(1), obj_match.group(2), obj_match.start(),
+                   int_line_end, obj_match.end())
+            int_pos = int_line_end
+
+    @staticmethod
+    def parse_tocs(str_text: str):
+        """
+        Reads the table of contents block ("%% - Table of Contents" to
+        "%% - End of Table of Contents") from the text.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+
+        Returns:
+            list: The sections with 4 spaces used to describe subsection layer
+            index, or None if the table of contents is not detected.
+        """
+        obj_match = RE_TOCS_BEGIN.search(str_text)
+        if obj_match is None:
+            return None
+        lst_text = []
+        int_pos = obj_match.end() + 1
+        while int_pos < len(str_text):
+            int_line_end = str_text.find('\n', int_pos)
+            if int_line_end < 0:
+                int_line_end = len(str_text)
+            str_line = str_text[int_pos:int_line_end].strip()
+            if str_line == STR_TOCS_END:
+                break
+            lst_text.append(str_line[7:])
+            int_pos = int_line_end + 1
+        return lst_text
+
+    @staticmethod
+    def parse_entry(str_text: str, int_entry_start: int, int_entry_end: int):
+        """
+        Parses a single entry located by scan_entries.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+            int_entry_start (int): The offset of "@" of the entry.
+            int_entry_end (int): The offset of the end of the closing line of the entry.
+
+        Returns:
+            BibReference: The parsed reference, or None if no entry is found.
+        """
+        lst_refs = BibParser.parse_text(str_text, int_entry_start, int_entry_end)
+        if lst_refs:
+            return lst_refs[0]
+        return None
+
+    @staticmethod
+    def parse_text(str_text: str, int_start: int = 0, int_end: int = None,
+                   lst_spans: list = None):
+        """
+        Parses all entries in the text.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+            int_start (int): The offset where parsing starts.
+            int_end (int): The offset where parsing stops (default: end of text).
+            lst_spans (list): If given, (str_id, int_entry_start, int_entry_end)
+            of each parsed entry is appended to it, with the same meaning as
+            in scan_entries.
+
+        Returns:
+            list: The parsed references (BibReference) in file order.
+        """
+        if int_end is None:
+            int_end = len(str_text)
+        lst_refs = []
+        int_pos = int_start
+        while True:
+            obj_match = RE_ENTRY_HEADER.search(str_text, int_pos, int_end)
+            if obj_match is None:
+                return lst_refs
+            obj_reference = BibReference()
+            obj_reference.str_type = sys.intern(obj_match.group(1).lower())
+            obj_reference.enum_type = DICT_PUBLICATION_TYPE.get(
+                obj_reference.str_type, PublicationType.OTHERS)
+            obj_reference.str_id = obj_match.group(2)
+            obj_body = RE_ENTRY_SIMPLE.match(str_text, obj_match.end())
+            if obj_body is not None:
+                # fast path: shallow nesting, so all fields in one findall
+                int_close = obj_body.end() - 1
+                for str_field, str_braced, str_quoted, str_bare in \
+                        RE_FIELD_SIMPLE.findall(str_text, obj_match.end(), int_close):
+                    str_attribute = DICT_FIELD_ATTRIBUTE.get(str_field)
+                    if str_attribute is None:
+                        str_attribute = DICT_FIELD_ATTRIBUTE.get(str_field.lower())
+                        if str_attribute is None:
+                            continue
+                    str_value = str_braced or str_quoted or str_bare
+                    if '\n' in str_value:
+                        str_value = RE_LINE_BREAK.sub(' ', str_value)
+                    if str_attribute in SET_INTERNED_ATTRIBUTES:
+                        str_value = sys.intern(str_value)
+                    setattr(obj_reference, str_attribute, str_value)
+            else:
+                int_close = BibParser.__walk_fields(
+                    str_text, obj_match.end(), obj_reference)
+                if int_close < 0:
+                    # unterminated entry, which is ignored
+                    return lst_refs
+            int_pos = str_text.find('\n', int_close)
+            if int_pos < 0:
+                int_pos = len(str_text)
+            # hex_catid stamp after the closing brace
+            obj_catid = RE_CATID.match(str_text, int_close + 1, int_pos)
+            if obj_catid is not None:
+                obj_reference.hex_catid = int(obj_catid.group(1), 16)
+            lst_refs.append(obj_reference)
+            if lst_spans is not None:
+                lst_spans.append(
+                    (obj_reference.str_id, obj_match.start(), int_pos))
+
+    @staticmethod
+    def split_text(str_text: str, int_chunks: int):
+        """
+        Splits the text into chunks of about equal size that start at entry
+        headers, i.e. lines starting with "@type{", so that no entry is cut.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+            int_chunks (int): The number of chunks wanted.
+
+        Returns:
+            list: (int_start, int_end) of each chunk, in file order. There are
+            fewer chunks than wanted if the text has too few entries.
+        """
+        int_size = len(str_text) // max(1, int_chunks)
+        lst_bounds = [0]
+        for iter_index in range(1, int_chunks):
+            obj_match = RE_ENTRY_HEADER.search(str_text, max(lst_bounds[-1] + 1, iter_index * int_size))
+            if obj_match is None:
+                break
+            if obj_match.start() > lst_bounds[-1]:
+                lst_bounds.append(obj_match.start())
+        lst_bounds.append(len(str_text))
+        return list(zip(lst_bounds[:-1], lst_bounds[1:]))
+
+    @staticmethod
+    def parse_text_in_parallel(str_text: str, int_workers: int = None, lst_spans: list = None):
+        """
+        Parses all entries in the text with a pool of worker processes. The
+        text is split by split_text into chunks that are parsed in parallel,
+        and the references are returned in file order, as parse_text does;
+        the repeated field values are interned again in this process.
+
+        Parameters:
+            str_text (str): The text of the bib file.
+            int_workers (int): The number of worker processes (default: the
+            number of processors).
+            lst_spans (list): If given, (str_id, int_entry_start, int_entry_end)
+            of each parsed entry is appended to it, as in parse_text.
+
+        Returns:
+            list: The parsed references (BibReference) in file order.
+        """
+        int_workers = int_workers or os.cpu_count() or 1
+        # a few chunks per worker even out the differences between chunks
+        lst_chunks = BibParser.split_text(str_text, int_workers * 4)
+        if int_workers == 1 or len(lst_chunks) == 1:
+            return BibParser.parse_text(str_text, lst_spans=lst_spans)
+        lst_refs = []
+        with ProcessPoolExecutor(max_workers=int_workers) as obj_executor:
+            iter_results = obj_executor.map(
+                return_parsed_chunk, (str_text[int_start:int_end] for int_start, int_end in lst_chunks))
+            for (int_start, _), (lst_chunk_refs, lst_chunk_spans) in zip(lst_chunks, iter_results):
+                for obj_reference in lst_chunk_refs:
+                    obj_reference.str_type = sys.intern(obj_reference.str_type)
+                    for str_attribute in SET_INTERNED_ATTRIBUTES:
+                        str_value = getattr(obj_reference, str_attribute)
+                        if str_value is not None:
+                            setattr(obj_reference, str_attribute, sys.intern(str_value))
+                lst_refs.extend(lst_chunk_refs)
+                if lst_spans is not None:
+                    lst_spans.extend((str_id, int_entry_start + int_start, int_entry_end + int_start)
+                                     for str_id, int_entry_start, int_entry_end in lst_chunk_spans)
+        return lst_refs
+
+    @staticmethod
+    def __walk_fields(str_text, int_pos, obj_reference):
+        """
+        Walks through the fields of an entry starting at int_pos, and stores
+        the recognized field values in obj_reference (if not None).
+
+        Returns:
+            int: The offset of the closing brace of the entry, or -1 if the
+            entry is not closed.
+        """
+        while True:
+            obj_match = RE_FIELD_SIMPLE.match(str_text, int_pos)
+            if obj_match is not None:
+                # fast path: value with shallow nesting
+                int_pos = obj_match.end()
+                if obj_reference is not None:
+                    str_attribute = DICT_FIELD_ATTRIBUTE.get(
+                        obj_match.group(1).lower())
+                    if str_attribute is not None:
+                        str_value = obj_match.group(2)
+                        if str_value is None:
+                            str_value = obj_match.group(3)
+                            if str_value is None:
+                                str_value = obj_match.group(4)
+                        BibParser.__set_field(
+                            obj_reference, str_attribute, str_value)
+                continue
+            obj_match = RE_ENTRY_CLOSE.match(str_text, int_pos)
+            if obj_match is not None:
+                return obj_match.end() - 1
+            obj_match = RE_FIELD_NAME.match(str_text, int_pos)
+            if obj_match is None:
+                # malformed field; skip to the closing brace of the entry
+                return BibParser.__find_closing_brace(str_text, int_pos)
+            # slow path: value with deeply nested braces
+            str_field = obj_match.group(1).lower()
+            int_pos = obj_match.end()
+            if str_text[int_pos:int_pos + 1] == '{':
+                int_value_end = BibParser.__find_closing_brace(
+                    str_text, int_pos + 1)
+            elif str_text[int_pos:int_pos + 1] == '"':
+                int_value_end = BibParser.__find_closing_quote(
+                    str_text, int_pos + 1)
+            else:
+                return BibParser.__find_closing_brace(str_text, int_pos)
+            if int_value_end < 0:
+                return -1
+            if obj_reference is not None:
+                str_attribute = DICT_FIELD_ATTRIBUTE.get(str_field)
+                if str_attribute is not None:
+                    BibParser.__set_field(obj_reference, str_attribute,
+                                          str_text[int_pos + 1:int_value_end])
+            int_pos = int_value_end + 1
+
+    @staticmethod
+    def __set_field(obj_reference, str_attribute, str_value):
+        """
+        Stores a field value in obj_reference, joining the lines of a
+        multi-line value and interning repeated values.
+        """
+        if '\n' in str_value:
+            str_value = RE_LINE_BREAK.sub(' ', str_value)
+        if str_attribute in SET_INTERNED_ATTRIBUTES:
+            str_value = sys.intern(str_value)
+        setattr(obj_reference, str_attribute, str_value)
+
+    @staticmethod
+    def __find_closing_brace(str_text, int_pos):
+        """
+        Returns the offset of the brace that closes the brace opened right
+        before int_pos, or -1 if it is not closed.
+        """
+        int_depth = 1
+        for obj_match in RE_BRACE.finditer(str_text, int_pos):
+            if obj_match.group(0) == '{':
+                int_depth += 1
+            else:
+                int_depth -= 1
+                if int_depth == 0:
+                    return obj_match.start()
+        return -1
+
+    @staticmethod
+    def __find_closing_quote(str_text, int_pos):
+        """
+        Returns the offset of the double quote that closes the quoted value
+        started right before int_pos, or -1 if it is not closed. Double quotes
+        inside braces are part of the value.
+        """
+        int_depth = 0
+        for obj_match in RE_BRACE_QUOTE.finditer(str_text, int_pos):
+            str_token = obj_match.group(0)
+            if str_token == '{':
+                int_depth += 1
+            elif str_token == '}':
+                int_depth -= 1
+                if int_depth < 0:
+                    return -1
+            elif int_depth == 0:
+                return obj_match.start()
+        return -1
+
+
+def return_parsed_chunk(str_chunk: str):
+    """
+    return_parsed_chunk parses a chunk of a bib file in a worker process of
+    BibParser.parse_text_in_parallel. Returns the references and the spans
+    of the entries, with offsets relative to the chunk.
+    """
+    lst_spans = []
+    return BibParser.parse_text(str_chunk, lst_spans=lst_spans), lst_spans
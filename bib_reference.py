@@ -41,8 +41,16 @@ class BibReference:
     - str_url (str): The URL of the reference (for online references).
     - str_urldate (str): The date when the URL was accessed (for online references).
     - hex_catid (int): The hexadecimal category ID (for bib management).
+
+    The attributes are stored in __slots__ rather than in a per-instance
+    __dict__ to keep large libraries compact.
     """
 
+    __slots__ = ('enum_type', 'str_type', 'str_id', 'str_title', 'str_author',
+                 'str_journal', 'str_volume', 'str_number', 'str_pages',
+                 'str_year', 'str_publisher', 'str_booktitle',
+                 'str_organization', 'str_url', 'str_urldate', 'hex_catid')
+
     enum_type: PublicationType
     str_type: str
     str_id: str
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibReplacer applies a table of search-and-replace rules to the fields of
+the references, e.g. "GUI" to "{GUI}" in titles or "Systems" to "Syst." in
+journals.
+@author: github.com/sunluelectric
+"""
+
+import re
+import sys
+from bib_parser import DICT_FIELD_ATTRIBUTE, SET_INTERNED_ATTRIBUTES
+from self_error import GeneralErrorMessage
+
+# rule line, e.g. "journal, booktitle: Transactions => Trans."; the fields are
+# separated from the pattern by the first ":" and the pattern from the
+# replacement by the last "=>"
+RE_RULE = re.compile(r'^\s*([\w\s,*]+?)\s*:\s*(.*\S)\s*=>\s*(.*?)\s*$')
+
+
+class BibReplacer:
+    """
+    Class BibReplacer is a batch search-and-replace engine.
+
+    A rules file has one rule per line in the format
+    "fields: pattern => replacement", where fields is a comma separated list
+    of bib fields (e.g. "journal, booktitle") or "*" for all fields. The
+    pattern is a literal string, or a regular expression if it is enclosed in
+    slashes, e.g. "title: /\\bGUI\\b/ => {GUI}"; the replacement is always
+    literal. Blank lines and lines starting with "#" are ignored.
+
+    The rules of each field are compiled into a single regular expression
+    with one named alternative per rule, so that every field value is scanned
+    once for all the rules. Where several rules match at the same position,
+    the rule listed first wins; replaced text is not matched again. Since
+    values such as journal names repeat across references, the result of each
+    distinct value is computed once per field.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the BibReplacer class.
+        """
+        self.lst_rules = []  # (lst_fields, str_pattern, str_replacement)
+        self.dict_field_regex = {}  # key: attribute, value: combined regex
+
+    def create_rules_from_file(self, path_rules: str):
+        """
+        Reads and compiles the rules from a rules file.
+
+        Parameters:
+            path_rules (str): The path to the rules file.
+        """
+        with open(path_rules, 'r') as file_rules:
+            self.create_rules_from_list(file_rules.read().split('\n'))
+
+    def create_rules_from_list(self, lst_text: list):
+        """
+        Compiles the rules from a list of rule lines.
+
+        Parameters:
+            lst_text (list): The rule lines.
+        """
+        self.lst_rules = []
+        lst_patterns = []
+        for iter_index, iter_item in enumerate(lst_text):
+            if iter_item.strip() == '' or iter_item.lstrip().startswith('#'):
+                continue
+            obj_match = RE_RULE.match(iter_item)
+            if obj_match is None:
+                raise GeneralErrorMessage(
+                    "Rule in line " + str(iter_index + 1) + " cannot be recognized: " + iter_item)
+            lst_fields = [iter_field.strip().lower() for iter_field in obj_match.group(1).split(',')]
+            if '*' in lst_fields:
+                lst_fields = list(DICT_FIELD_ATTRIBUTE)
+            for iter_field in lst_fields:
+                if iter_field not in DICT_FIELD_ATTRIBUTE:
+                    raise GeneralErrorMessage(
+                        "Rule in line " + str(iter_index + 1) + " uses unknown field: " + iter_field)
+            str_pattern = obj_match.group(2)
+            if len(str_pattern) > 2 and str_pattern.startswith('/') and str_pattern.endswith('/'):
+                try:
+                    obj_regex = re.compile(str_pattern[1:-1])
+                except re.error as obj_error:
+                    raise GeneralErrorMessage(
+                        "Rule in line " + str(iter_index + 1) + " has an invalid pattern: " +
+                        str(obj_error)) from obj_error
+                if obj_regex.groups:
+                    raise GeneralErrorMessage(
+                        "Rule in line " + str(iter_index + 1) +
+                        " uses capturing groups; use non-capturing groups (?:...) instead.")
+                lst_patterns.append(str_pattern[1:-1])
+            else:
+                lst_patterns.append(re.escape(str_pattern))
+            self.lst_rules.append((lst_fields, str_pattern, obj_match.group(3)))
+        self.__combine_rules(lst_patterns)
+
+    def replace(self, dict_refs: dict, flag_dry_run: bool = True):
+        """
+        Applies the rules to all the references in a single pass.
+
+        Parameters:
+            dict_refs (dict): The references (key: reference id, value: BibReference).
+            flag_dry_run (bool): If True, the references are left unchanged
+            and only the report is computed.
+
+        Returns:
+            dict: The report with the following keys:
+            - 'lst_rule_hits': per rule, the number of replacements;
+            - 'dict_changes': reference key mapped to a list of
+            (str_field, str_old_value, str_new_value).
+        """
+        lst_hits = [0] * len(self.lst_rules)
+        dict_changes = {}
+        for str_attribute, obj_regex in self.dict_field_regex.items():
+            str_field = str_attribute[4:]
+            flag_intern = str_attribute in SET_INTERNED_ATTRIBUTES
+            dict_results = {}  # key: old value, value: (new value, hits per rule)
+            for str_id, obj_reference in dict_refs.items():
+                str_value = getattr(obj_reference, str_attribute)
+                if not str_value:
+                    continue
+                tuple_result = dict_results.get(str_value)
+                if tuple_result is None:
+                    tuple_result = dict_results[str_value] = self.__replace_value(obj_regex, str_value)
+                str_new_value, dict_value_hits = tuple_result
+                if str_new_value == str_value:
+                    continue
+                for iter_key, iter_value in dict_value_hits.items():
+                    lst_hits[iter_key] += iter_value
+                dict_changes.setdefault(str_id, []).append((str_field, str_value, str_new_value))
+                if not flag_dry_run:
+                    if flag_intern:
+                        str_new_value = sys.intern(str_new_value)
+                    setattr(obj_reference, str_attribute, str_new_value)
+        return {'lst_rule_hits': lst_hits, 'dict_changes': dict_changes}
+
+    def return_report_printout(self, dict_report: dict):
+        """
+        Returns the hits of each rule in a list with printout format.
+
+        Parameters:
+            dict_report (dict): The report returned by replace.
+
+        Returns:
+            list: The report lines.
+        """
+        lst_print = ["Hits   Rule"]
+        for iter_index, (lst_fields, str_pattern, str_replacement) in enumerate(self.lst_rules):
+            lst_print.append(str(dict_report['lst_rule_hits'][iter_index]).rjust(4) + "   " +
+                             ", ".join(lst_fields) + ": " + str_pattern + " => " + str_replacement)
+        lst_print.append(str(sum(len(iter_item) for iter_item in dict_report['dict_changes'].values())) +
+                         " field(s) in " + str(len(dict_report['dict_changes'])) +
+                         " reference(s) changed.")
+        return lst_print
+
+    @staticmethod
+    def return_diff_printout(dict_report: dict):
+        """
+        Returns the changes of each reference in a list with diff format.
+
+        Parameters:
+            dict_report (dict): The report returned by replace.
+
+        Returns:
+            list: The diff lines, sorted by reference key.
+        """
+        lst_print = []
+        for str_id in sorted(dict_report['dict_changes']):
+            for str_field, str_old_value, str_new_value in dict_report['dict_changes'][str_id]:
+                lst_print.append("@@ " + str_id + " " + str_field)
+                lst_print.append("- " + str_old_value)
+                lst_print.append("+ " + str_new_value)
+        return lst_print
+
+    def __combine_rules(self, lst_patterns: list):
+        """
+        Compiles the patterns of the rules of each field into one regular
+        expression; the alternative of rule i is the group named "r<i>".
+        """
+        dict_field_alternatives = {}
+        for iter_index, (lst_fields, _, _) in enumerate(self.lst_rules):
+            for iter_field in lst_fields:
+                dict_field_alternatives.setdefault(DICT_FIELD_ATTRIBUTE[iter_field], []).append(
+                    '(?P<r' + str(iter_index) + '>' + lst_patterns[iter_index] + ')')
+        # in the order of the fields in a reference
+        self.dict_field_regex = {iter_key: re.compile('|'.join(dict_field_alternatives[iter_key]))
+                                 for iter_key in DICT_FIELD_ATTRIBUTE.values()
+                                 if iter_key in dict_field_alternatives}
+
+    def __replace_value(self, obj_regex, str_value: str):
+        """
+        Returns the value with all the replacements made, and the number of
+        replacements of each rule.
+        """
+        dict_hits = {}
+        lst_rules = self.lst_rules
+
+        def return_replacement(obj_match):
+            int_rule = int(obj_match.lastgroup[1:])
+            dict_hits[int_rule] = dict_hits.get(int_rule, 0) + 1
+            return lst_rules[int_rule][2]
+
+        return obj_regex.sub(return_replacement, str_value), dict_hits
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibSearchIndex is an inverted index for full-text search over the title,
+author, journal and year of the references.
+@author: github.com/sunluelectric
+"""
+
+import re
+import math
+import heapq
+from bisect import bisect_left, insort
+
+# searchable fields and the BibReference attributes they are indexed from
+DICT_SEARCH_FIELDS = {
+    'title': ('str_title',),
+    'author': ('str_author',),
+    'journal': ('str_journal', 'str_booktitle'),
+    'year': ('str_year',),
+}
+# weight of a match in each field in the relevance score
+DICT_FIELD_WEIGHTS = {'title': 2.0, 'author': 1.5, 'journal': 1.0, 'year': 0.5}
+RE_LATEX = re.compile(r'\\[^a-zA-Z]|[{}]')  # accent commands such as \" and braces
+RE_TOKEN = re.compile(r'[a-z0-9]+')
+RE_YEAR_RANGE = re.compile(r'^(\d*)\.\.(\d*)$')
+SET_OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+class BibSearchIndex:
+    """
+    Class BibSearchIndex keeps, for every field and every token of the field,
+    the postings (reference key mapped to the number of occurrences of the
+    token), and the sorted tokens of every field for prefix queries. The
+    tokens of each reference are remembered, so references are added and
+    removed without rebuilding the index.
+
+    A query is a list of terms separated by spaces; all terms must match,
+    unless the query is split by "OR" into alternatives. A term is:
+    - a word, matched in any field, e.g. "estimation";
+    - a word restricted to a field, e.g. "author:abur" or "journal:automatica";
+    - a prefix ending with "*", e.g. "estimat*" or "title:kalm*";
+    - a year range, e.g. "year:2019..2021", "year:2019.." or "year:..1990";
+    - any of the above preceded by "-" or "NOT" to exclude the matches.
+    Words are lowercased and LaTeX accents and braces are removed, so that
+    "astrom" matches "Astr{\\"o}m". Results are ranked by the sum over the
+    matched tokens of their TF-IDF weight times the weight of the field.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the BibSearchIndex class.
+        """
+        self.dict_postings = {iter_key: {} for iter_key in DICT_SEARCH_FIELDS}
+        self.dict_sorted_tokens = {iter_key: [] for iter_key in DICT_SEARCH_FIELDS}
+        self.dict_ref_tokens = {}  # key: reference id, value: list of (field, token)
+
+    def __len__(self):
+        return len(self.dict_ref_tokens)
+
+    @staticmethod
+    def return_tokens(str_text: str):
+        """
+        Returns the tokens of a text.
+
+        Parameters:
+            str_text (str): The text.
+
+        Returns:
+            list: The lowercase tokens, with repetitions.
+        """
+        return RE_TOKEN.findall(RE_LATEX.sub('', str_text).lower())
+
+    def create_index_from_refs(self, dict_refs: dict):
+        """
+        Creates the index from all the references.
+
+        Parameters:
+            dict_refs (dict): The references (key: reference id, value: BibReference).
+        """
+        self.dict_postings = {iter_key: {} for iter_key in DICT_SEARCH_FIELDS}
+        self.dict_sorted_tokens = {iter_key: [] for iter_key in DICT_SEARCH_FIELDS}
+        self.dict_ref_tokens = {}
+        for iter_key, iter_value in dict_refs.items():
+            self.add_ref(iter_key, iter_value)
+
+    def add_ref(self, str_id: str, obj_reference):
+        """
+        Adds a reference to the index, replacing its former tokens if it is
+        already indexed.
+
+        Parameters:
+            str_id (str): The reference key.
+            obj_reference (BibReference): The reference.
+        """
+        self.remove_ref(str_id)
+        lst_ref_tokens = []
+        for str_field, tuple_attributes in DICT_SEARCH_FIELDS.items():
+            dict_counts = {}
+            for str_attribute in tuple_attributes:
+                str_value = getattr(obj_reference, str_attribute)
+                if str_value:
+                    for str_token in self.return_tokens(str_value):
+                        dict_counts[str_token] = dict_counts.get(str_token, 0) + 1
+            dict_field_postings = self.dict_postings[str_field]
+            for str_token, int_count in dict_counts.items():
+                dict_token_postings = dict_field_postings.get(str_token)
+                if dict_token_postings is None:
+                    dict_token_postings = dict_field_postings[str_token] = {}
+                    insort(self.dict_sorted_tokens[str_field], str_token)
+                dict_token_postings[str_id] = int_count
+                lst_ref_tokens.append((str_field, str_token))
+        self.dict_ref_tokens[str_id] = lst_ref_tokens
+
+    def remove_ref(self, str_id: str):
+        """
+        Removes a reference from the index, if it is indexed.
+
+        Parameters:
+            str_id (str): The reference key.
+        """
+        for str_field, str_token in self.dict_ref_tokens.pop(str_id, ()):
+            dict_field_postings = self.dict_postings[str_field]
+            dict_token_postings = dict_field_postings[str_token]
+            del dict_token_postings[str_id]
+            if not dict_token_postings:
+                del dict_field_postings[str_token]
+                lst_tokens = self.dict_sorted_tokens[str_field]
+                del lst_tokens[bisect_left(lst_tokens, str_token)]
+
+    def search(self, str_query: str, int_limit: int = None):
+        """
+        Searches the references matching a query.
+
+        Parameters:
+            str_query (str): The query (see the class documentation).
+            int_limit (int): The maximum number of results (default: all).
+
+        Returns:
+            list: (str_id, float_score) of the matching references, in
+            descending order of score, then ascending order of key.
+        """
+        dict_results = {}
+        for lst_clauses in self.__parse_query(str_query):
+            for iter_key, iter_value in self.__evaluate_clauses(lst_clauses).items():
+                dict_results[iter_key] = dict_results.get(iter_key, 0.0) + iter_value
+        if int_limit is None:
+            return sorted(dict_results.items(), key=lambda iter_item: (-iter_item[1], iter_item[0]))
+        return heapq.nsmallest(int_limit, dict_results.items(),
+                               key=lambda iter_item: (-iter_item[1], iter_item[0]))
+
+    @staticmethod
+    def __parse_query(str_query: str):
+        """
+        Splits a query into alternatives of clauses (flag_negated, str_field,
+        str_value); str_field is None for a term matched in any field.
+        """
+        lst_alternatives = [[]]
+        flag_negated = False
+        for str_word in str_query.split():
+            if str_word in SET_OPERATORS:
+                if str_word == 'OR':
+                    lst_alternatives.append([])
+                flag_negated = str_word == 'NOT'
+                continue
+            if str_word.startswith('-') and len(str_word) > 1:
+                flag_negated = True
+                str_word = str_word[1:]
+            str_field = None
+            if ':' in str_word:
+                str_prefix, str_value = str_word.split(':', 1)
+                if str_prefix.lower() in DICT_SEARCH_FIELDS:
+                    str_field, str_word = str_prefix.lower(), str_value
+            lst_alternatives[-1].append((flag_negated, str_field, str_word))
+            flag_negated = False
+        return [iter_item for iter_item in lst_alternatives if iter_item]
+
+    def __evaluate_clauses(self, lst_clauses: list):
+        """
+        Returns the references matching all the clauses, with their scores.
+        """
+        lst_positive = []
+        set_negative = set()
+        for flag_negated, str_field, str_value in lst_clauses:
+            dict_scores = self.__evaluate_term(str_field, str_value)
+            if dict_scores is None:
+                continue
+            if flag_negated:
+                set_negative.update(dict_scores)
+            else:
+                lst_positive.append(dict_scores)
+        if not lst_positive:
+            if not set_negative:
+                return {}
+            lst_positive.append(dict.fromkeys(self.dict_ref_tokens, 0.0))
+        # intersect from the smallest posting set
+        lst_positive.sort(key=len)
+        dict_results = {iter_key: iter_value for iter_key, iter_value in lst_positive[0].items()
+                        if iter_key not in set_negative}
+        for dict_scores in lst_positive[1:]:
+            dict_results = {iter_key: iter_value + dict_scores[iter_key]
+                            for iter_key, iter_value in dict_results.items()
+                            if iter_key in dict_scores}
+        return dict_results
+
+    def __evaluate_term(self, str_field: str, str_value: str):
+        """
+        Returns the references matching a term, with their scores, or None if
+        the term has no token.
+        """
+        lst_fields = list(DICT_SEARCH_FIELDS) if str_field is None else [str_field]
+        if str_field == 'year':
+            obj_match = RE_YEAR_RANGE.match(str_value)
+            if obj_match is not None:
+                return self.__evaluate_year_range(obj_match.group(1), obj_match.group(2))
+        flag_prefix = str_value.endswith('*')
+        lst_tokens = self.return_tokens(str_value)
+        if not lst_tokens:
+            return None
+        dict_results = None
+        for iter_index, str_token in enumerate(lst_tokens):
+            dict_scores = {}
+            for iter_field in lst_fields:
+                if flag_prefix and iter_index == len(lst_tokens) - 1:
+                    lst_matched_tokens = self.__return_tokens_with_prefix(iter_field, str_token)
+                else:
+                    lst_matched_tokens = [str_token]
+                for iter_token in lst_matched_tokens:
+                    self.__add_token_scores(dict_scores, iter_field, iter_token)
+            if dict_results is None:
+                dict_results = dict_scores
+            else:
+                dict_results = {iter_key: iter_value + dict_scores[iter_key]
+                                for iter_key, iter_value in dict_results.items()
+                                if iter_key in dict_scores}
+        return dict_results
+
+    def __evaluate_year_range(self, str_start: str, str_end: str):
+        """
+        Returns the references with a year in a range (both ends included).
+        """
+        int_start = int(str_start) if str_start else None
+        int_end = int(str_end) if str_end else None
+        dict_scores = {}
+        for str_token in self.dict_sorted_tokens['year']:
+            int_year = int(str_token)
+            if (int_start is None or int_year >= int_start) and \
+                    (int_end is None or int_year <= int_end):
+                self.__add_token_scores(dict_scores, 'year', str_token)
+        return dict_scores
+
+    def __return_tokens_with_prefix(self, str_field: str, str_prefix: str):
+        """
+        Returns the tokens of a field that start with a prefix.
+        """
+        lst_tokens = self.dict_sorted_tokens[str_field]
+        int_start = bisect_left(lst_tokens, str_prefix)
+        int_end = bisect_left(lst_tokens, str_prefix + '\uffff', int_start)
+        return lst_tokens[int_start:int_end]
+
+    def __add_token_scores(self, dict_scores: dict, str_field: str, str_token: str):
+        """
+        Adds the TF-IDF scores of the references containing a token in a
+        field to dict_scores.
+        """
+        dict_token_postings = self.dict_postings[str_field].get(str_token)
+        if not dict_token_postings:
+            return
+        float_weight = DICT_FIELD_WEIGHTS[str_field] * \
+            math.log(1.0 + len(self.dict_ref_tokens) / len(dict_token_postings))
+        for iter_key, iter_value in dict_token_postings.items():
+            dict_scores[iter_key] = dict_scores.get(iter_key, 0.0) + iter_value * float_weight
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibCatidSuggester suggests catids for the references that are not under
+a leaf section, learned from the references that are. It requires NumPy.
+@author: github.com/sunluelectric
+"""
+
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RE_TOKEN = re.compile(r'[a-z0-9]+')
+SET_STOP_WORDS = {'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into',
+                  'of', 'on', 'or', 'the', 'to', 'via', 'with'}
+# upper bound of the number of elements of a dense block of query vectors
+INT_BLOCK_ELEMENTS = 2**22
+
+
+class BibCatidSuggester:
+    """
+    Class BibCatidSuggester is a nearest-centroid classifier over TF-IDF
+    vectors.
+
+    Every reference is turned into a bag of terms from its title words, its
+    journal (or booktitle) words and its author surnames, each term tagged
+    with its field so that e.g. "control" in a title and in a journal name
+    are different terms. fit weighs the terms of the references under leaf
+    sections by TF-IDF, normalizes each reference vector and sums them into
+    one normalized centroid per leaf section. suggest scores the references
+    to categorize against all the centroids with one matrix product per block
+    of references; the score of a section is the cosine similarity between
+    the reference and the section centroid, between 0 and 1.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the BibCatidSuggester class.
+        """
+        if np is None:
+            raise ImportError(
+                "BibCatidSuggester requires NumPy; install it with 'pip install numpy'.")
+        self.dict_vocabulary = {}  # key: term, value: column index
+        self.lst_leaf_keys = []  # leaf section of each centroid row
+        self.array_idf = None
+        self.array_centroids = None
+
+    @staticmethod
+    def return_terms(obj_reference):
+        """
+        Returns the terms of a reference.
+
+        Parameters:
+            obj_reference (BibReference): The reference.
+
+        Returns:
+            list: The terms, with repetitions.
+        """
+        lst_terms = []
+        if obj_reference.str_title:
+            lst_terms.extend('t:' + iter_item
+                             for iter_item in RE_TOKEN.findall(obj_reference.str_title.lower())
+                             if iter_item not in SET_STOP_WORDS)
+        str_venue = obj_reference.str_journal or obj_reference.str_booktitle
+        if str_venue:
+            lst_terms.extend('j:' + iter_item
+                             for iter_item in RE_TOKEN.findall(str_venue.lower())
+                             if iter_item not in SET_STOP_WORDS)
+        if obj_reference.str_author:
+            for iter_item in obj_reference.str_author.split(' and '):
+                if ',' in iter_item:
+                    str_surname = iter_item.split(',')[0]
+                else:
+                    str_surname = iter_item.strip().split(' ')[-1]
+                str_surname = ''.join(RE_TOKEN.findall(str_surname.lower()))
+                if str_surname:
+                    lst_terms.append('a:' + str_surname)
+        return lst_terms
+
+    def fit(self, dict_refs: dict, set_leaf_keys: set):
+        """
+        Computes the vocabulary, the IDF weights and the leaf centroids from
+        the references whose catid is a leaf section.
+
+        Parameters:
+            dict_refs (dict): The references (key: reference id, value: BibReference).
+            set_leaf_keys (set): The leaf section keys of the table of contents.
+
+        Returns:
+            int: The number of references learned from.
+        """
+        self.dict_vocabulary = {}
+        lst_docs = []
+        lst_doc_leaves = []
+        for obj_reference in dict_refs.values():
+            if obj_reference.hex_catid in set_leaf_keys:
+                lst_docs.append(self.return_terms(obj_reference))
+                lst_doc_leaves.append(obj_reference.hex_catid)
+        for lst_terms in lst_docs:
+            for iter_item in lst_terms:
+                if iter_item not in self.dict_vocabulary:
+                    self.dict_vocabulary[iter_item] = len(self.dict_vocabulary)
+        self.lst_leaf_keys = sorted(set(lst_doc_leaves))
+        dict_leaf_rows = {iter_key: iter_index for iter_index, iter_key in enumerate(self.lst_leaf_keys)}
+        array_rows, array_cols, array_values = self.__return_sparse_terms(lst_docs)
+        int_terms = len(self.dict_vocabulary)
+        # document frequency: count each (document, term) pair once
+        array_df = np.bincount(array_cols, minlength=int_terms)
+        self.array_idf = np.log((1 + len(lst_docs)) / (1 + array_df)) + 1.0
+        array_values = self.__return_normalized_values(
+            array_rows, array_cols, array_values, len(lst_docs))
+        self.array_centroids = np.zeros((len(self.lst_leaf_keys), int_terms))
+        array_leaf_rows = np.array([dict_leaf_rows[iter_item] for iter_item in lst_doc_leaves],
+                                   dtype=np.intp)
+        np.add.at(self.array_centroids, (array_leaf_rows[array_rows], array_cols), array_values)
+        array_norms = np.linalg.norm(self.array_centroids, axis=1, keepdims=True)
+        array_norms[array_norms == 0] = 1.0
+        self.array_centroids /= array_norms
+        return len(lst_docs)
+
+    def suggest(self, dict_refs: dict, lst_ids: list, int_top_k: int = 3):
+        """
+        Ranks the leaf sections for each of the given references.
+
+        Parameters:
+            dict_refs (dict): The references (key: reference id, value: BibReference).
+            lst_ids (list): The keys of the references to rank sections for.
+            int_top_k (int): The number of candidate sections per reference.
+
+        Returns:
+            dict: The reference key mapped to a list of (hex_catid, float_score)
+            in descending order of score. References with no known term have
+            an empty list.
+        """
+        dict_suggestions = {iter_item: [] for iter_item in lst_ids}
+        if self.array_centroids is None or not self.lst_leaf_keys or not lst_ids:
+            return dict_suggestions
+        int_top_k = min(int_top_k, len(self.lst_leaf_keys))
+        int_terms = len(self.dict_vocabulary)
+        int_block = max(1, INT_BLOCK_ELEMENTS // max(1, int_terms))
+        for int_start in range(0, len(lst_ids), int_block):
+            lst_block = lst_ids[int_start:int_start + int_block]
+            lst_docs = [self.return_terms(dict_refs[iter_item]) for iter_item in lst_block]
+            array_rows, array_cols, array_values = self.__return_sparse_terms(lst_docs)
+            array_values = self.__return_normalized_values(
+                array_rows, array_cols, array_values, len(lst_docs))
+            array_queries = np.zeros((len(lst_block), int_terms))
+            array_queries[array_rows, array_cols] = array_values
+            array_scores = array_queries @ self.array_centroids.T
+            array_top = np.argsort(-array_scores, axis=1, kind='stable')[:, :int_top_k]
+            for iter_index, str_id in enumerate(lst_block):
+                dict_suggestions[str_id] = [
+                    (self.lst_leaf_keys[iter_col], float(array_scores[iter_index, iter_col]))
+                    for iter_col in array_top[iter_index]
+                    if array_scores[iter_index, iter_col] > 0]
+        return dict_suggestions
+
+    def __return_sparse_terms(self, lst_docs: list):
+        """
+        Returns the term counts of the documents as coordinate arrays (row,
+        column, count), one entry per distinct known term of each document.
+        """
+        dict_counts = {}
+        for iter_row, lst_terms in enumerate(lst_docs):
+            for iter_item in lst_terms:
+                int_col = self.dict_vocabulary.get(iter_item)
+                if int_col is None:
+                    continue
+                tuple_key = (iter_row, int_col)
+                dict_counts[tuple_key] = dict_counts.get(tuple_key, 0) + 1
+        array_rows = np.fromiter((iter_key[0] for iter_key in dict_counts), dtype=np.intp,
+                                 count=len(dict_counts))
+        array_cols = np.fromiter((iter_key[1] for iter_key in dict_counts), dtype=np.intp,
+                                 count=len(dict_counts))
+        array_values = np.fromiter(dict_counts.values(), dtype=float, count=len(dict_counts))
+        return array_rows, array_cols, array_values
+
+    def __return_normalized_values(self, array_rows, array_cols, array_values, int_docs: int):
+        """
+        Weighs the term counts by sublinear TF and IDF and normalizes each
+        document vector to unit length.
+        """
+        array_values = (1.0 + np.log(array_values)) * self.array_idf[array_cols]
+        array_norms = np.sqrt(np.bincount(array_rows, weights=array_values**2, minlength=int_docs))
+        array_norms[array_norms == 0] = 1.0
+        return array_values / array_norms[array_rows]
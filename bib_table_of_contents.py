@@ -5,6 +5,7 @@ used in class BibManager.
 @sunluelectric: github.com/sunluelectric
 """
 
+from bisect import bisect_left
 from dataclasses import dataclass
 from self_error import GeneralErrorMessage
 
@@ -23,10 +24,19 @@ class BibTableOfContents:
     The class also includes methods to display the table of contents in the console,
     return the table of contents in a list with printout format, and retrieve all section indexes.
 
+    Whenever the table of contents is created, the tree structure (sorted section indexes, parent,
+    children, depth and leaf sections) is computed once and stored, so that the queries do not
+    need to sort the section indexes or infer the layers again.
+
     """
     hex_section_index: int
     int_section_layer: int
     dict_tocs: dict  # key: section index, value: section name
+    lst_sorted_keys: list  # section indexes in ascending order
+    dict_parent: dict  # key: section index, value: parent section index (None for top layer)
+    dict_children: dict  # key: section index, value: list of subsection indexes
+    dict_depth: dict  # key: section index, value: layer of the section (1 to 8)
+    set_leaf_keys: set  # section indexes without subsections
 
     def __init__(self):
         """
@@ -35,6 +45,11 @@ class BibTableOfContents:
         self.hex_section_index = 0x00000000
         self.int_section_layer = 0
         self.dict_tocs = {}
+        self.lst_sorted_keys = []
+        self.dict_parent = {}
+        self.dict_children = {}
+        self.dict_depth = {}
+        self.set_leaf_keys = set()
 
     def create_tocs_from_multidimensional_list(self, lst_tocs: list):
         """
@@ -47,6 +62,7 @@ class BibTableOfContents:
         self.int_section_layer = 0
         self.dict_tocs = {}
         self.__create_sublayer_from_multidimensional_list(lst_tocs)
+        self.__build_tree()
 
     def create_tocs_from_space_list(self, lst_text: list):
         """
@@ -65,22 +81,44 @@ class BibTableOfContents:
             else:
                 GeneralErrorMessage("Variable int_section_layer overflow.")
             self.__add_section(iter_item.lstrip(' '))
+        self.__build_tree()
+
+    def create_tocs_from_dict(self, dict_tocs: dict):
+        """
+        Creates the table of contents from a dictionary of section indexes and
+        section names, e.g. a dict_tocs stored earlier.
+
+        Parameters:
+            dict_tocs (dict): The dictionary with section indexes as keys and section names as values.
+        """
+        self.hex_section_index = max(dict_tocs) if dict_tocs else 0x00000000
+        self.int_section_layer = 0
+        self.dict_tocs = dict(dict_tocs)
+        self.__build_tree()
 
     def display_tocs(self):
         """
         Shows the table of contents in the console.
         """
-        lst_tocs_keys = list(self.dict_tocs.keys())
-        lst_tocs_keys.sort()
+        for iter_item in self.return_tocs_index_printout():
+            print(iter_item)
+
+    def return_tocs_index_printout(self):
+        """
+        Returns the table of contents with the section indexes, as shown by display_tocs.
+
+        Returns:
+            list: The lines shown in the console.
+        """
         if self.dict_tocs:
-            print("Index No.   Section Name")
-            for iter_item in lst_tocs_keys:
-                int_layer_of_item = 9 - hex(iter_item).count('0')
+            lst_print = ["Index No.   Section Name"]
+            for iter_item in self.lst_sorted_keys:
+                int_layer_of_item = self.dict_depth[iter_item]
                 str_print = hex(iter_item)[-8:] + "    " * \
                     int_layer_of_item + self.dict_tocs[iter_item]
-                print(str_print)
-        else:
-            print("The table of contents is empty.")
+                lst_print.append(str_print)
+            return lst_print
+        return ["The table of contents is empty."]
 
     def return_tocs_printout(self):
         """
@@ -91,10 +129,8 @@ class BibTableOfContents:
         """
         if self.dict_tocs:
             lst_print = []
-            lst_tocs_keys = list(self.dict_tocs.keys())
-            lst_tocs_keys.sort()
-            for iter_item in lst_tocs_keys:
-                int_layer_of_item = 9 - hex(iter_item).count('0')
+            for iter_item in self.lst_sorted_keys:
+                int_layer_of_item = self.dict_depth[iter_item]
                 str_print = '    '*(int_layer_of_item-1) + \
                     self.dict_tocs[iter_item]
                 lst_print.append(str_print)
@@ -109,9 +145,7 @@ class BibTableOfContents:
             list: All section indexes.
         """
         if self.dict_tocs:
-            lst_tocs_keys = list(self.dict_tocs.keys())
-            lst_tocs_keys.sort()
-            return lst_tocs_keys
+            return list(self.lst_sorted_keys)
         return None
 
     def return_tocs_leaf_keys(self):
@@ -122,17 +156,99 @@ class BibTableOfContents:
             list: All the section indexes where the section does not have a subsection.
         """
         if self.dict_tocs:
-            lst_print = []
-            lst_tocs_keys = list(self.dict_tocs.keys())
-            lst_tocs_keys.sort()
-            for iter_index, iter_item in enumerate(lst_tocs_keys):
-                if iter_index == len(lst_tocs_keys) - 1:
-                    lst_print.append(iter_item)
-                elif hex(iter_item).count('0') <= hex(lst_tocs_keys[iter_index + 1]).count('0'):
-                    lst_print.append(iter_item)
-            return lst_print
+            return [iter_item for iter_item in self.lst_sorted_keys
+                    if iter_item in self.set_leaf_keys]
         return None
 
+    def return_parent_key(self, hex_key: int):
+        """
+        Returns the index of the parent section.
+
+        Parameters:
+            hex_key (int): The section index.
+
+        Returns:
+            int: The index of the parent section, or None for a top layer section.
+        """
+        return self.dict_parent.get(hex_key)
+
+    def return_children_keys(self, hex_key: int):
+        """
+        Returns the indexes of the direct subsections.
+
+        Parameters:
+            hex_key (int): The section index.
+
+        Returns:
+            list: The indexes of the direct subsections in ascending order.
+        """
+        return list(self.dict_children.get(hex_key, []))
+
+    def return_descendant_keys(self, hex_key: int):
+        """
+        Returns the index of a section followed by the indexes of all its subsections.
+
+        Parameters:
+            hex_key (int): The section index.
+
+        Returns:
+            list: The section indexes in ascending order.
+        """
+        if hex_key not in self.dict_depth:
+            return []
+        int_start = bisect_left(self.lst_sorted_keys, hex_key)
+        int_end = bisect_left(self.lst_sorted_keys,
+                              hex_key + 16**(8 - self.dict_depth[hex_key]))
+        return self.lst_sorted_keys[int_start:int_end]
+
+    def return_section_path(self, hex_key: int):
+        """
+        Returns the names of the sections from the top layer down to a section.
+
+        Parameters:
+            hex_key (int): The section index.
+
+        Returns:
+            list: The section names, ending with the name of the section, or an empty list if
+            the section does not exist.
+        """
+        lst_path = []
+        while hex_key is not None and hex_key in self.dict_tocs:
+            lst_path.append(self.dict_tocs[hex_key])
+            hex_key = self.dict_parent[hex_key]
+        lst_path.reverse()
+        return lst_path
+
+    def __build_tree(self):
+        """
+        Computes the sorted section indexes, and the parent, children, depth and leaf sections
+        from dict_tocs.
+
+        The layer of a section is given by the position of its last non-zero hexadecimal digit,
+        so internal zero digits do not affect it.
+        """
+        self.lst_sorted_keys = sorted(self.dict_tocs)
+        self.dict_parent = {}
+        self.dict_children = {iter_item: [] for iter_item in self.lst_sorted_keys}
+        self.dict_depth = {}
+        for iter_item in self.lst_sorted_keys:
+            int_depth = 8
+            while int_depth > 1 and iter_item % 16**(9 - int_depth) == 0:
+                int_depth -= 1
+            self.dict_depth[iter_item] = int_depth
+            # the nearest existing ancestor is the parent
+            hex_parent = None
+            for iter_layer in range(int_depth - 1, 0, -1):
+                hex_ancestor = iter_item - iter_item % 16**(8 - iter_layer)
+                if hex_ancestor in self.dict_children:
+                    hex_parent = hex_ancestor
+                    break
+            self.dict_parent[iter_item] = hex_parent
+            if hex_parent is not None:
+                self.dict_children[hex_parent].append(iter_item)
+        self.set_leaf_keys = {iter_item for iter_item, iter_value in self.dict_children.items()
+                              if not iter_value}
+
     def __create_sublayer_from_multidimensional_list(self, lst_single_list: list):
         """
         Creates a sub-layer in the table of contents from a list in a recursive manner.
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Class BibWriter generates the text of a bib file in sections and writes it to
+disk atomically.
+@author: github.com/sunluelectric
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+# titles of the sections that hold the references not under a leaf section,
+# in the order they are written after the table of contents sections
+DICT_SPECIAL_SECTIONS = {
+    -1: "Uncategorized references",
+    -3: "References categorized not under leaf",
+    -2: "Unrecoganized catid",
+}
+
+
+class BibWriter:
+    """
+    Class BibWriter generates the text of a bib file.
+
+    The text is made of a header block (name, time and author stamps and the
+    table of contents) followed by one block per section, where each block is
+    generated as a single string. The blocks are written to a temporary file
+    which then replaces the bib file, so an interrupted write never leaves a
+    truncated bib file behind.
+    """
+
+    @staticmethod
+    def return_header_printout(path_bib: str, str_author_name: str, obj_tocs):
+        """
+        Returns the header block of the bib file.
+
+        Parameters:
+            path_bib (str): The path to the bib file.
+            str_author_name (str): The name in the "Updated by" stamp.
+            obj_tocs (BibTableOfContents): The table of contents, or None.
+
+        Returns:
+            str: The header block.
+        """
+        lst_print = ["%% - Name of bib file: " + path_bib.split('/')[-1],
+                     "%% - Latest updated time: " +
+                     datetime.now().strftime("%B %d, %Y %H:%M:%S"),
+                     "%% - Updated by: " + str_author_name]
+        if obj_tocs is None:
+            lst_print.append("%% - Table of Contents: None")
+        else:
+            lst_print.append("%% - Table of Contents")
+            for iter_item in obj_tocs.return_tocs_printout() or []:
+                lst_print.append("%% - > " + iter_item)
+            lst_print.append("%% - End of Table of Contents")
+            lst_print.append("")
+        return '\n'.join(lst_print) + '\n'
+
+    @staticmethod
+    def return_section_keys(dict_refs_categorized: dict):
+        """
+        Returns the keys of dict_refs_categorized in the order the sections are
+        written: the table of contents sections in ascending order, followed
+        by the uncategorized, not-under-leaf and unrecognized sections.
+
+        Parameters:
+            dict_refs_categorized (dict): The categorized references.
+
+        Returns:
+            list: The section keys.
+        """
+        lst_keys = sorted(iter_key for iter_key in dict_refs_categorized
+                          if iter_key > 0)
+        return lst_keys + [iter_key for iter_key in DICT_SPECIAL_SECTIONS
+                           if iter_key in dict_refs_categorized]
+
+    @staticmethod
+    def return_section_printout(hex_section: int, dict_refs_section: dict, obj_tocs):
+        """
+        Returns the block of a section: the section title line followed by
+        the references of the section sorted by key.
+
+        Parameters:
+            hex_section (int): The section key in dict_refs_categorized.
+            dict_refs_section (dict): The references in the section.
+            obj_tocs (BibTableOfContents): The table of contents.
+
+        Returns:
+            str: The section block.
+        """
+        if hex_section > 0:
+            lst_print = ["", "%% - " + hex(hex_section) + " " +
+                         obj_tocs.dict_tocs[hex_section]]
+        else:
+            lst_print = ["", "%% - " + DICT_SPECIAL_SECTIONS[hex_section]]
+        for iter_key in sorted(dict_refs_section):
+            lst_refs_print = dict_refs_section[iter_key].return_refs_printout()
+            if lst_refs_print is not None:
+                lst_print.append("")
+                lst_print.extend(lst_refs_print)
+        return '\n'.join(lst_print) + '\n'
+
+    @staticmethod
+    def write_atomically(path_bib: str, lst_blocks: list):
+        """
+        Writes the blocks to a temporary file in the directory of path_bib
+        and renames it to path_bib.
+
+        Parameters:
+            path_bib (str): The path to the bib file.
+            lst_blocks (list): The blocks (str) of the bib file.
+
+        Returns:
+            int: The number of characters written.
+        """
+        str_dir = os.path.dirname(os.path.abspath(path_bib))
+        int_fd, path_temp = tempfile.mkstemp(dir=str_dir, suffix='.bib.tmp')
+        int_written = 0
+        try:
+            with os.fdopen(int_fd, 'w', buffering=2**20) as file_bib:
+                for str_block in lst_blocks:
+                    int_written += file_bib.write(str_block)
+            if os.path.isfile(path_bib):
+                shutil.copymode(path_bib, path_temp)
+            os.replace(path_temp, path_bib)
+        except BaseException:
+            if os.path.exists(path_temp):
+                os.remove(path_temp)
+            raise
+        return int_written
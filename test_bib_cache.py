@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from bib_cache import BibCache
+
+
+class BibCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir_temp = tempfile.TemporaryDirectory()
+        self.path_bib = os.path.join(self.dir_temp.name, 'refs.bib')
+        self.str_text = '@book{a,\n  title = {A}\n}\n'
+        with open(self.path_bib, 'w') as file_bib:
+            file_bib.write(self.str_text)
+
+    def tearDown(self):
+        self.dir_temp.cleanup()
+
+    def test_load_missing_cache(self):
+        self.assertIsNone(BibCache(self.path_bib).load())
+
+    def test_save_and_load(self):
+        obj_cache = BibCache(self.path_bib)
+        obj_cache.save({'dict_refs': {'a': 1}}, self.str_text)
+        self.assertTrue(os.path.isfile(self.path_bib + '.cache'))
+        self.assertEqual(obj_cache.load(), {'dict_refs': {'a': 1}})
+
+    def test_load_after_change(self):
+        obj_cache = BibCache(self.path_bib)
+        obj_cache.save({'dict_refs': {'a': 1}}, self.str_text)
+        with open(self.path_bib, 'a') as file_bib:
+            file_bib.write('@book{b,\n  title = {B}\n}\n')
+        self.assertIsNone(obj_cache.load())
+
+    def test_load_after_touch(self):
+        obj_cache = BibCache(self.path_bib)
+        obj_cache.save({'dict_refs': {'a': 1}}, self.str_text)
+        obj_stat = os.stat(self.path_bib)
+        os.utime(self.path_bib, ns=(obj_stat.st_atime_ns,
+                                    obj_stat.st_mtime_ns + 10**9))
+        self.assertEqual(obj_cache.load(), {'dict_refs': {'a': 1}})
+
+    def test_load_other_version(self):
+        obj_cache = BibCache(self.path_bib)
+        with patch('bib_cache.CACHE_VERSION', 0):
+            obj_cache.save({'dict_refs': {'a': 1}}, self.str_text)
+        self.assertIsNone(obj_cache.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
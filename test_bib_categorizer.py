@@ -0,0 +1,59 @@
+import io
+import unittest
+from unittest.mock import patch
+from bib_categorizer import BibCategorizer
+from bib_parser import BibParser
+from bib_table_of_contents import BibTableOfContents
+from self_error import GeneralErrorMessage
+
+
+class BibCategorizerTest(unittest.TestCase):
+    def setUp(self):
+        self.obj_tocs = BibTableOfContents()
+        self.obj_tocs.create_tocs_from_multidimensional_list(
+            ['Introduction', ['Estimation', 'Control'], 'Discussion'])
+        self.dict_refs = {obj_ref.str_id: obj_ref for obj_ref in BibParser.parse_text('''
+@article{abur2004, title = {Power system state estimation}, journal = {IEEE Transactions on Power Systems}}
+@article{kalman1960, title = {A new approach to linear filtering}, author = {Kalman, Rudolf E}}
+@article{astrom1995, title = {Adaptive control}, journal = {Automatica}}
+@article{boyd2004, title = {Convex optimization}}
+@article{sun2020, title = {Robust state estimation and control}}
+''')}
+        self.obj_categorizer = BibCategorizer()
+        self.obj_categorizer.create_rules_from_list([
+            '# estimation',
+            'title: state estimation => 0x11000000',
+            'author: kalman => 0x11000000',
+            '',
+            'title: \\bcontrol\\b => 0x12000000',
+            'journal: ^automatica$ => 0x12000000',
+            'key: ^boyd => 0x20000000',
+        ], self.obj_tocs)
+
+    def test_categorize(self):
+        dict_report = self.obj_categorizer.categorize(self.dict_refs)
+        self.assertEqual(dict_report['dict_assigned'],
+                         {'abur2004': 0x11000000, 'kalman1960': 0x11000000,
+                          'astrom1995': 0x12000000, 'boyd2004': 0x20000000})
+        self.assertEqual(dict_report['dict_conflicts'], {'sun2020': [0x11000000, 0x12000000]})
+        self.assertEqual(dict_report['lst_unmatched'], [])
+        self.assertEqual(dict_report['lst_rule_hits'], [2, 1, 2, 1, 1])
+        self.assertEqual(dict_report['lst_rule_conflicts'], [1, 0, 1, 0, 0])
+
+    def test_categorize_selected_ids(self):
+        dict_report = self.obj_categorizer.categorize(self.dict_refs, ['boyd2004', 'kalman1960'])
+        self.assertEqual(dict_report['dict_assigned'],
+                         {'boyd2004': 0x20000000, 'kalman1960': 0x11000000})
+
+    def test_invalid_rules(self):
+        for str_rule in ['title state => 0x11000000',
+                         'volume: 12 => 0x11000000',
+                         'title: state => 0x10000000',
+                         'title: (state => 0x11000000']:
+            with patch('sys.stdout', new_callable=io.StringIO):
+                with self.assertRaises(GeneralErrorMessage):
+                    BibCategorizer().create_rules_from_list([str_rule], self.obj_tocs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from bib_category_index import BibCategoryIndex
+from bib_parser import BibParser
+from bib_table_of_contents import BibTableOfContents
+
+
+class BibCategoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        obj_tocs = BibTableOfContents()
+        obj_tocs.create_tocs_from_multidimensional_list(
+            ['Introduction', ['Methods', 'Results'], 'Discussion'])
+        self.obj_index = BibCategoryIndex(obj_tocs)
+        self.dict_refs = {obj_ref.str_id: obj_ref for obj_ref in BibParser.parse_text('''
+@book{a, title = {A}} % catid = 0x11000000
+@book{b, title = {B}} % catid = 0x12000000
+@book{c, title = {C}} % catid = 0x10000000
+@book{d, title = {D}} % catid = 0x50000000
+@book{e, title = {E}}
+@book{f, title = {F}} % catid = 0x20000000
+''')}
+        self.obj_index.create_index_from_refs(self.dict_refs)
+
+    def test_create_index_from_refs(self):
+        self.assertEqual(
+            {iter_key: sorted(iter_value) for iter_key, iter_value in self.obj_index.dict_sections.items()},
+            {-1: ['e'], -2: ['d'], -3: ['c'], 0x10000000: [],
+             0x11000000: ['a'], 0x12000000: ['b'], 0x20000000: ['f']})
+
+    def test_add_and_remove_ref(self):
+        self.dict_refs['e'].hex_catid = 0x12000000
+        self.obj_index.add_ref('e', self.dict_refs['e'])
+        self.obj_index.remove_ref('a')
+        self.assertEqual(self.obj_index.dict_sections[-1], {})
+        self.assertEqual(sorted(self.obj_index.dict_sections[0x12000000]), ['b', 'e'])
+        self.assertEqual(self.obj_index.dict_sections[0x11000000], {})
+        self.assertNotIn('a', self.obj_index.dict_ref_sections)
+
+    def test_return_refs_in_section(self):
+        self.assertEqual(sorted(self.obj_index.return_refs_in_section(0x10000000)),
+                         ['a', 'b'])
+        self.assertEqual(self.obj_index.return_refs_in_section(0x10000000, False), {})
+        self.assertEqual(sorted(self.obj_index.return_refs_in_section(0x20000000)), ['f'])
+        self.assertEqual(sorted(self.obj_index.return_refs_in_section(-2)), ['d'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from bib_duplicates import BibDuplicateFinder
+from bib_parser import BibParser
+
+
+class BibDuplicateFinderTest(unittest.TestCase):
+    def setUp(self):
+        self.dict_refs = {obj_ref.str_id: obj_ref for obj_ref in BibParser.parse_text('''
+@article{abur2004, title = {Power system state estimation: theory and implementation}, author = {Abur, Ali and Exposito, Antonio Gomez}, year = {2004}}
+@article{abur04, title = {Power System State Estimation - Theory and Implementation}, author = {Abur, A. and G{\\'o}mez Exp{\\'o}sito, Antonio}, pages = {1--10}} % catid = 0x10000000
+@book{abur_book, title = {{Power system state estimation}: theory and implementation.}, author = {A. Abur and A. G. Exposito}}
+@article{kalman1960, title = {A new approach to linear filtering and prediction problems}, author = {Kalman, Rudolf E}, year = {1960}}
+@article{kalman1961, title = {New results in linear filtering and prediction theory}, author = {Kalman, Rudolf E and Bucy, Richard S}, year = {1961}}
+@article{astrom1995, title = {Adaptive control}, author = {Astr{\\"o}m, Karl J}}
+@article{astrom_ac, title = {Adaptive Control}, author = {{\\AA}str{\\"o}m, K. J.}}
+''')}
+
+    def test_normalization(self):
+        self.assertEqual(BibDuplicateFinder.return_normalized_title('{Power} System-State   Estimation.'),
+                         'power system state estimation')
+        self.assertEqual(BibDuplicateFinder.return_normalized_surnames(
+            'Astr{\\"o}m, Karl J and Richard M Murray'), ['astrom', 'murray'])
+
+    def test_find_duplicates(self):
+        lst_clusters = BibDuplicateFinder().find_duplicates(self.dict_refs)
+        self.assertEqual([dict_cluster['lst_ids'] for dict_cluster in lst_clusters],
+                         [['abur04', 'abur2004', 'abur_book'], ['astrom1995', 'astrom_ac']])
+        for dict_cluster in lst_clusters:
+            for str_id_a, str_id_b, float_similarity in dict_cluster['lst_pairs']:
+                self.assertLess(str_id_a, str_id_b)
+                self.assertTrue(0.8 <= float_similarity <= 1.0)
+
+    def test_find_duplicates_threshold(self):
+        lst_clusters = BibDuplicateFinder().find_duplicates(self.dict_refs, 1.0)
+        self.assertEqual(lst_clusters, [{'lst_ids': ['abur2004', 'abur_book'],
+                                         'lst_pairs': [('abur2004', 'abur_book', 1.0)]}])
+
+    def test_merge_references(self):
+        obj_kept = BibDuplicateFinder.merge_references(
+            [self.dict_refs['abur_book'], self.dict_refs['abur2004'], self.dict_refs['abur04']])
+        self.assertIs(obj_kept, self.dict_refs['abur2004'])
+        self.assertEqual(obj_kept.str_pages, '1--10')
+        self.assertEqual(obj_kept.hex_catid, 0x10000000)
+        self.assertEqual(obj_kept.str_year, '2004')
+
+
+if __name__ == '__main__':
+    unittest.main()
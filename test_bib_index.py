@@ -0,0 +1,27 @@
+import unittest
+from bib_index import BibEntryIndex
+
+
+class BibEntryIndexTest(unittest.TestCase):
+    def test_create_index_from_text(self):
+        str_text = '@book{a,\n  title = {A}\n}\n\n@book{b,\n  title = {B}\n} % catid = 0x10000000\n'
+        obj_index = BibEntryIndex()
+        obj_index.create_index_from_text(str_text)
+        self.assertEqual(list(obj_index.dict_entries), ['a', 'b'])
+        int_start, int_end, _ = obj_index.dict_entries['b']
+        self.assertEqual(str_text[int_start:int_end],
+                         '@book{b,\n  title = {B}\n} % catid = 0x10000000')
+
+    def test_compare(self):
+        obj_old_index = BibEntryIndex()
+        obj_old_index.create_index_from_text(
+            '@book{a, title = {A}}\n@book{b, title = {B}}\n@book{c, title = {C}}\n')
+        obj_new_index = BibEntryIndex()
+        obj_new_index.create_index_from_text(
+            '@book{a, title = {A}}\n\n@book{c, title = {C2}}\n@book{d, title = {D}}\n')
+        self.assertEqual(obj_old_index.compare(obj_new_index),
+                         (['d'], ['b'], ['c']))
+
+
+if __name__ == '__main__':
+    unittest.main()
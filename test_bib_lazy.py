@@ -0,0 +1,35 @@
+import unittest
+from bib_lazy import BibLazyReferenceDict
+from bib_reference import BibReference
+
+
+class BibLazyReferenceDictTest(unittest.TestCase):
+    def setUp(self):
+        self.dict_refs = BibLazyReferenceDict.create_from_text(
+            '@book{a,\n  title = {A}\n}\n@article{b,\n  title = {B}\n} % catid = 0x10000000\n')
+
+    def test_keys_without_parsing(self):
+        self.assertEqual(list(self.dict_refs), ['a', 'b'])
+        self.assertEqual(len(self.dict_refs), 2)
+        self.assertIn('b', self.dict_refs)
+        self.assertEqual(self.dict_refs.return_loaded_count(), 0)
+
+    def test_parse_on_access(self):
+        self.assertEqual(self.dict_refs['b'].str_title, 'B')
+        self.assertEqual(self.dict_refs['b'].hex_catid, 0x10000000)
+        self.assertIs(self.dict_refs['b'], self.dict_refs['b'])
+        self.assertEqual(self.dict_refs.return_loaded_count(), 1)
+        with self.assertRaises(KeyError):
+            _ = self.dict_refs['c']
+
+    def test_set_and_delete(self):
+        obj_reference = BibReference()
+        obj_reference.str_id = 'c'
+        self.dict_refs['c'] = obj_reference
+        del self.dict_refs['a']
+        self.assertEqual(list(self.dict_refs), ['b', 'c'])
+        self.assertIs(self.dict_refs['c'], obj_reference)
+
+
+if __name__ == '__main__':
+    unittest.main()
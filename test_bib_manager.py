@@ -1,6 +1,17 @@
+import io
+import os
+import tempfile
 import unittest
-from unittest.mock import patch
+from unittest.mock import ANY, patch
+from bib_benchmark import return_synthetic_bib
 from bib_manager import BibManager
+from bib_parser import BibParser
+from bib_writer import BibWriter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class BibManagerTest(unittest.TestCase):
@@ -84,6 +95,188 @@ class BibManagerTest(unittest.TestCase):
         mock_open.assert_called_once_with('/path/to/bib_file.bib', 'w')
         mock_open.return_value.__enter__.return_value.write.assert_called()
 
+    def test_dirty_sections_regenerated_on_update_bib(self):
+        with tempfile.TemporaryDirectory() as str_dir:
+            path_bib = os.path.join(str_dir, 'refs.bib')
+            with open(path_bib, 'w') as file_bib:
+                file_bib.write('''%% - Table of Contents
+%% - > Introduction
+%% - > Methods
+%% - End of Table of Contents
+
+@book{a, title = {A}} % catid = 0x10000000
+@book{b, title = {B}} % catid = 0x20000000
+@book{c, title = {C}}
+''')
+            self.bib_manager.path_bib = path_bib
+            with patch('sys.stdout', new_callable=io.StringIO):
+                self.bib_manager.read_bib()
+                self.bib_manager.update_bib(flag_confirm=False)
+            self.bib_manager.set_catid('c', 0x20000000)
+            with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout, \
+                    patch('bib_writer.BibWriter.return_section_printout',
+                          wraps=BibWriter.return_section_printout) as mock_printout:
+                self.bib_manager.update_bib(flag_confirm=False)
+            self.assertIn("2 of 5 section(s) have been generated.",
+                          mock_stdout.getvalue())
+            self.assertEqual(sorted(iter_call.args[0] for iter_call in mock_printout.call_args_list),
+                             [-1, 0x20000000])
+            with open(path_bib, 'r') as file_bib:
+                str_text = file_bib.read()
+            self.assertIn('''%% - 0x20000000 Methods
+
+@book{b,
+  title = {B}
+} % catid = 0x20000000
+
+@book{c,
+  title = {C}
+} % catid = 0x20000000
+''', str_text)
+            self.assertTrue(str_text.endswith('''%% - 0x10000000 Introduction
+
+@book{a,
+  title = {A}
+} % catid = 0x10000000
+
+%% - 0x20000000 Methods
+
+@book{b,
+  title = {B}
+} % catid = 0x20000000
+
+@book{c,
+  title = {C}
+} % catid = 0x20000000
+
+%% - Uncategorized references
+
+%% - References categorized not under leaf
+
+%% - Unrecoganized catid
+'''))
+
+    def test_catid_from_rules(self):
+        with tempfile.TemporaryDirectory() as str_dir:
+            path_bib = os.path.join(str_dir, 'refs.bib')
+            path_rules = os.path.join(str_dir, 'rules.txt')
+            with open(path_bib, 'w') as file_bib:
+                file_bib.write('''%% - Table of Contents
+%% - > Introduction
+%% - > Methods
+%% - End of Table of Contents
+
+@book{a, title = {State estimation}} % catid = 0x10000000
+@book{b, title = {State estimation}}
+@book{c, title = {Control}}
+@book{d, title = {Game theory}}
+''')
+            with open(path_rules, 'w') as file_rules:
+                file_rules.write('title: estimation => 0x20000000\ntitle: control => 0x10000000\n')
+            self.bib_manager.path_bib = path_bib
+            with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+                self.bib_manager.read_bib()
+                dict_report = self.bib_manager.update_catid_from_rules(path_rules)
+            self.assertIn("2 assigned, 0 in conflict, 1 unmatched reference(s).",
+                          mock_stdout.getvalue())
+            self.assertEqual(dict_report['lst_unmatched'], ['d'])
+            self.assertEqual(self.bib_manager.dict_refs['a'].hex_catid, 0x10000000)
+            self.assertEqual(self.bib_manager.dict_refs['b'].hex_catid, 0x20000000)
+            self.assertEqual(self.bib_manager.dict_refs['c'].hex_catid, 0x10000000)
+            self.assertEqual(sorted(self.bib_manager.return_refs_in_section(-1)), ['d'])
+
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_catid_from_suggestions(self):
+        with tempfile.TemporaryDirectory() as str_dir:
+            path_bib = os.path.join(str_dir, 'refs.bib')
+            with open(path_bib, 'w') as file_bib:
+                file_bib.write('''%% - Table of Contents
+%% - > Estimation
+%% - > Control
+%% - End of Table of Contents
+
+@book{a, title = {Power system state estimation}} % catid = 0x10000000
+@book{b, title = {Adaptive control}} % catid = 0x20000000
+@book{c, title = {State estimation}}
+@book{d, title = {Control}} % catid = 0x30000000
+@book{e, title = {Game theory}}
+''')
+            self.bib_manager.path_bib = path_bib
+            with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+                self.bib_manager.read_bib()
+                dict_suggestions = self.bib_manager.update_catid_from_suggestions(1, 0.5)
+            self.assertEqual(sorted(dict_suggestions), ['c', 'd', 'e'])
+            self.assertIn("2 of 3 suggestion(s) have been accepted.", mock_stdout.getvalue())
+            self.assertEqual(self.bib_manager.dict_refs['c'].hex_catid, 0x10000000)
+            self.assertEqual(self.bib_manager.dict_refs['d'].hex_catid, 0x20000000)
+            self.assertIsNone(self.bib_manager.dict_refs['e'].hex_catid)
+
+
+    def test_search_refs(self):
+        for str_text in ['@book{a, title = {State estimation}, year = {2004}}',
+                         '@book{b, title = {Adaptive control}, year = {1995}}']:
+            self.bib_manager.add_ref(BibParser.parse_entry(str_text, 0, len(str_text)))
+        self.assertEqual(self.bib_manager.search_refs('estimation'), [('a', ANY)])
+        str_text = '@book{c, title = {Estimation and control}, year = {2020}}'
+        self.bib_manager.add_ref(BibParser.parse_entry(str_text, 0, len(str_text)))
+        self.bib_manager.remove_ref('a')
+        self.assertEqual(sorted(iter_item[0] for iter_item in self.bib_manager.search_refs('control')),
+                         ['b', 'c'])
+        self.assertEqual([iter_item[0] for iter_item in self.bib_manager.search_refs('estimation')], ['c'])
+        self.assertEqual([iter_item[0] for iter_item in self.bib_manager.search_refs('year:..2000')], ['b'])
+
+    def test_replace_in_refs(self):
+        str_text = '@article{a, title = {A GUI}, journal = {IEEE Transactions on Power Systems}}'
+        self.bib_manager.add_ref(BibParser.parse_entry(str_text, 0, len(str_text)))
+        with tempfile.TemporaryDirectory() as str_dir:
+            path_rules = os.path.join(str_dir, 'rules.txt')
+            with open(path_rules, 'w') as file_rules:
+                file_rules.write('journal: Transactions on => Trans.\ntitle: GUI => {GUI}\n')
+            with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+                self.bib_manager.replace_in_refs(path_rules)
+            self.assertIn('- A GUI\n+ A {GUI}\n', mock_stdout.getvalue())
+            self.assertEqual(self.bib_manager.dict_refs['a'].str_title, 'A GUI')
+            self.assertEqual(self.bib_manager.search_refs('title:gui')[0][0], 'a')
+            with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+                self.bib_manager.replace_in_refs(path_rules, False)
+            self.assertIn("2 field(s) in 1 reference(s) changed.", mock_stdout.getvalue())
+        self.assertEqual(self.bib_manager.dict_refs['a'].str_journal, 'IEEE Trans. Power Systems')
+        self.assertEqual(self.bib_manager.search_refs('journal:transactions'), [])
+        self.assertIn(-1, self.bib_manager.set_dirty_sections)
+
+
+    def test_find_duplicates(self):
+        for str_text in ['@article{a, title = {Adaptive control}, author = {Astrom, Karl J}}',
+                         '@article{b, title = {Adaptive Control.}, author = {K. J. Astrom}, year = {1995}}',
+                         '@article{c, title = {Robust control}, author = {Zhou, Kemin}}']:
+            self.bib_manager.add_ref(BibParser.parse_entry(str_text, 0, len(str_text)))
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            lst_clusters = self.bib_manager.find_duplicates(flag_merge=True)
+        self.assertEqual([dict_cluster['lst_ids'] for dict_cluster in lst_clusters], [['a', 'b']])
+        self.assertIn("    a ~ b: 1.00", mock_stdout.getvalue())
+        self.assertIn("1 duplicate reference(s) have been merged.", mock_stdout.getvalue())
+        self.assertEqual(sorted(self.bib_manager.dict_refs), ['b', 'c'])
+        self.assertEqual(self.bib_manager.dict_refs['b'].str_year, '1995')
+
+
+    def test_parallel_read_bib(self):
+        with tempfile.TemporaryDirectory() as str_dir:
+            path_bib = os.path.join(str_dir, 'refs.bib')
+            with open(path_bib, 'w') as file_bib:
+                file_bib.write(return_synthetic_bib(100) + '@book{dup, title = {A}}\n@book{dup, title = {B}}\n')
+            obj_serial = BibManager()
+            obj_serial.path_bib = path_bib
+            self.bib_manager.path_bib = path_bib
+            with patch('sys.stdout', new_callable=io.StringIO):
+                obj_serial.read_bib()
+                self.bib_manager.read_bib(flag_parallel=True, int_workers=2)
+        self.assertEqual(list(self.bib_manager.dict_refs), list(obj_serial.dict_refs))
+        self.assertEqual(self.bib_manager.dict_refs, obj_serial.dict_refs)
+        self.assertEqual(self.bib_manager.dict_refs['dup'].str_title, 'B')
+        self.assertEqual(self.bib_manager.obj_refs_index.dict_entries,
+                         obj_serial.obj_refs_index.dict_entries)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,98 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from bib_merge import BibMerger, main
+from bib_parser import BibParser
+
+STR_BIB_A = '''%% - Table of Contents
+%% - > Estimation
+%% - >     Static
+%% - >     Dynamic
+%% - > Control
+%% - End of Table of Contents
+
+@book{abur2004, title = {Power system state estimation}} % catid = 0x11000000
+@book{kalman1960, title = {A new approach to linear filtering}} % catid = 0x12000000
+@book{astrom1995, title = {Adaptive control}} % catid = 0x20000000
+'''
+STR_BIB_B = '''%% - Table of Contents
+%% - > Control
+%% - > Estimation
+%% - >     Dynamic
+%% - >     Robust
+%% - End of Table of Contents
+
+@book{kalman1960, title = {A new approach to linear filtering}} % catid = 0x21000000
+@book{astrom1995, title = {Adaptive control}, year = {1995}} % catid = 0x10000000
+@book{zhou1996, title = {Robust and optimal control}} % catid = 0x22000000
+@book{boyd2004, title = {Convex optimization}} % catid = 0x50000000
+'''
+
+
+class BibMergerTest(unittest.TestCase):
+    def setUp(self):
+        self.obj_dir = tempfile.TemporaryDirectory()
+        self.path_a = os.path.join(self.obj_dir.name, 'a.bib')
+        self.path_b = os.path.join(self.obj_dir.name, 'b.bib')
+        with open(self.path_a, 'w') as file_bib:
+            file_bib.write(STR_BIB_A)
+        with open(self.path_b, 'w') as file_bib:
+            file_bib.write(STR_BIB_B)
+        os.utime(self.path_a, (1000000000, 1000000000))
+
+    def tearDown(self):
+        self.obj_dir.cleanup()
+
+    def merge(self, str_policy, int_workers=1):
+        return BibMerger(str_policy, int_workers).merge_files([self.path_a, self.path_b])
+
+    def test_merge_tocs(self):
+        obj_tocs, dict_refs, _ = self.merge('keep-first')
+        self.assertEqual(obj_tocs.return_tocs_printout(),
+                         ['Estimation', '    Static', '    Dynamic', '    Robust', 'Control'])
+        self.assertEqual(dict_refs['zhou1996'].hex_catid, 0x13000000)
+        self.assertEqual(dict_refs['kalman1960'].hex_catid, 0x12000000)
+        self.assertIsNone(dict_refs['boyd2004'].hex_catid)
+
+    def test_keep_first(self):
+        _, dict_refs, lst_conflicts = self.merge('keep-first', 2)
+        self.assertEqual(sorted(dict_refs), ['abur2004', 'astrom1995', 'boyd2004', 'kalman1960', 'zhou1996'])
+        self.assertIsNone(dict_refs['astrom1995'].str_year)
+        self.assertEqual(lst_conflicts, [('astrom1995', [self.path_a, self.path_b], 'kept from ' + self.path_a)])
+
+    def test_keep_newest(self):
+        _, dict_refs, lst_conflicts = self.merge('keep-newest')
+        self.assertEqual(dict_refs['astrom1995'].str_year, '1995')
+        self.assertEqual(dict_refs['astrom1995'].hex_catid, 0x20000000)
+        self.assertEqual(lst_conflicts[0][2], 'kept from ' + self.path_b)
+
+    def test_rename(self):
+        _, dict_refs, lst_conflicts = self.merge('rename')
+        self.assertIsNone(dict_refs['astrom1995'].str_year)
+        self.assertEqual(dict_refs['astrom1995_2'].str_year, '1995')
+        self.assertEqual(dict_refs['astrom1995_2'].str_id, 'astrom1995_2')
+        self.assertEqual(lst_conflicts[0][2], 'renamed to astrom1995_2')
+
+    def test_field_merge(self):
+        _, dict_refs, lst_conflicts = self.merge('field-merge')
+        self.assertEqual(dict_refs['astrom1995'].str_year, '1995')
+        self.assertEqual(dict_refs['astrom1995'].hex_catid, 0x20000000)
+        self.assertEqual(lst_conflicts[0][2], 'merged')
+
+    def test_main(self):
+        path_output = os.path.join(self.obj_dir.name, 'merged.bib')
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            self.assertEqual(main([path_output, self.path_a, self.path_b, '--policy', 'rename',
+                                   '--workers', '1']), 0)
+        self.assertIn("A total of 6 publication(s) have been registered, with 1 key conflict(s).",
+                      mock_stdout.getvalue())
+        with open(path_output, 'r') as file_bib:
+            str_text = file_bib.read()
+        self.assertEqual(len(BibParser.parse_text(str_text)), 6)
+        self.assertIn('%% - >     Robust\n', str_text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from bib_benchmark import return_synthetic_bib
+from bib_parser import BibParser
+from bib_reference import PublicationType
+
+
+class BibParserTest(unittest.TestCase):
+    def test_parse_text_single_line_fields(self):
+        lst_refs = BibParser.parse_text('''@article{sun2020robust,
+  title     = {Robust state estimation},
+  author    = {Sun, Lu},
+  journal   = {IEEE Transactions on Power Systems},
+  year      = {2020}
+} % catid = 0x41500000
+''')
+        self.assertEqual(len(lst_refs), 1)
+        self.assertEqual(lst_refs[0].enum_type, PublicationType.ARTICLE)
+        self.assertEqual(lst_refs[0].str_id, 'sun2020robust')
+        self.assertEqual(lst_refs[0].str_title, 'Robust state estimation')
+        self.assertEqual(lst_refs[0].str_journal,
+                         'IEEE Transactions on Power Systems')
+        self.assertEqual(lst_refs[0].str_year, '2020')
+        self.assertEqual(lst_refs[0].hex_catid, 0x41500000)
+
+    def test_parse_text_multi_line_and_nested_braces(self):
+        lst_refs = BibParser.parse_text('''@Book{aastrom2011computer,
+  title = {Computer-controlled systems:
+           theory and design},
+  author = {{\\AA}str{\\"o}m, Karl Johan and {{Wittenmark}, {Bj{\\"o}rn}}},
+  publisher = "Courier {"}Dover{"} Publications",
+  year = 2011,
+  booktitle = {x}}
+''')
+        self.assertEqual(lst_refs[0].enum_type, PublicationType.BOOK)
+        self.assertEqual(lst_refs[0].str_title,
+                         'Computer-controlled systems: theory and design')
+        self.assertEqual(lst_refs[0].str_author,
+                         '{\\AA}str{\\"o}m, Karl Johan and {{Wittenmark}, {Bj{\\"o}rn}}')
+        self.assertEqual(lst_refs[0].str_publisher,
+                         'Courier {"}Dover{"} Publications')
+        self.assertEqual(lst_refs[0].str_year, '2011')
+        self.assertEqual(lst_refs[0].str_booktitle, 'x')
+        self.assertIsNone(lst_refs[0].hex_catid)
+
+    def test_parse_text_skips_comments(self):
+        lst_refs = BibParser.parse_text('''%% - Table of Contents
+%% - > Mathematics
+%% - End of Table of Contents
+
+%% - 0x10000000 Mathematics
+
+@misc{key1, title = {First}}
+@online{key2,
+  url = {https://example.com/?a=1},
+}
+''')
+        self.assertEqual([obj_ref.str_id for obj_ref in lst_refs],
+                         ['key1', 'key2'])
+        self.assertEqual(lst_refs[0].enum_type, PublicationType.OTHERS)
+        self.assertEqual(lst_refs[1].str_url, 'https://example.com/?a=1')
+
+    def test_scan_entries_and_parse_entry(self):
+        str_text = '@book{a,\n  title = {A}\n}\n\n@book{b,\n  title = {B}\n} % catid = 0x10000000\n'
+        lst_entries = list(BibParser.scan_entries(str_text))
+        self.assertEqual([iter_item[1] for iter_item in lst_entries], ['a', 'b'])
+        _, _, int_start, int_end, _ = lst_entries[1]
+        self.assertEqual(str_text[int_start:int_end],
+                         '@book{b,\n  title = {B}\n} % catid = 0x10000000')
+        obj_reference = BibParser.parse_entry(str_text, int_start, int_end)
+        self.assertEqual(obj_reference.str_title, 'B')
+        self.assertEqual(obj_reference.hex_catid, 0x10000000)
+
+    def test_parse_tocs(self):
+        str_text = '''%% - Name of bib file: refs.bib
+%% - Table of Contents
+%% - > Mathematics
+%% - >     Algebra
+%% - > Physics
+%% - End of Table of Contents
+
+@book{a, title = {A}}
+'''
+        self.assertEqual(BibParser.parse_tocs(str_text),
+                         ['Mathematics', '    Algebra', 'Physics'])
+        self.assertIsNone(BibParser.parse_tocs('@book{a, title = {A}}'))
+
+    def test_split_text(self):
+        str_text = return_synthetic_bib(50)
+        lst_chunks = BibParser.split_text(str_text, 7)
+        self.assertEqual(len(lst_chunks), 7)
+        self.assertEqual(lst_chunks[0][0], 0)
+        self.assertEqual(lst_chunks[-1][1], len(str_text))
+        for (_, int_end), (int_start, _) in zip(lst_chunks[:-1], lst_chunks[1:]):
+            self.assertEqual(int_end, int_start)
+            self.assertEqual(str_text[int_start], '@')
+        self.assertEqual(BibParser.split_text('@book{a, title = {A}}', 4), [(0, 21)])
+
+    def test_parse_text_in_parallel(self):
+        str_text = return_synthetic_bib(200)
+        lst_spans = []
+        lst_refs = BibParser.parse_text_in_parallel(str_text, 2, lst_spans)
+        lst_serial_spans = []
+        self.assertEqual(lst_refs, BibParser.parse_text(str_text, lst_spans=lst_serial_spans))
+        self.assertEqual(lst_spans, lst_serial_spans)
+        # values parsed in different worker processes are shared again
+        dict_journals = {}
+        for obj_reference in lst_refs:
+            if obj_reference.str_journal is not None:
+                self.assertIs(dict_journals.setdefault(obj_reference.str_journal, obj_reference.str_journal),
+                              obj_reference.str_journal)
+
+if __name__ == '__main__':
+    unittest.main()
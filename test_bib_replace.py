@@ -0,0 +1,58 @@
+import io
+import sys
+import unittest
+from unittest.mock import patch
+from bib_parser import BibParser
+from bib_replace import BibReplacer
+from self_error import GeneralErrorMessage
+
+
+class BibReplacerTest(unittest.TestCase):
+    def setUp(self):
+        self.dict_refs = {obj_ref.str_id: obj_ref for obj_ref in BibParser.parse_text('''
+@article{a, title = {A GUI for power systems}, journal = {IEEE Transactions on Power Systems}}
+@article{b, title = {GUIs and system design}, journal = {IEEE Transactions on Power Systems}}
+@inproceedings{c, title = {Control systems}, booktitle = {IEEE Transactions on Control Systems}}
+''')}
+        self.obj_replacer = BibReplacer()
+        self.obj_replacer.create_rules_from_list([
+            '# abbreviations',
+            'journal, booktitle: IEEE Transactions on => IEEE Trans.',
+            'journal,booktitle: Systems => Syst.',
+            'journal: Power Systems => Power Syst.',
+            '',
+            'title: /\\bGUI\\b/ => {GUI}',
+        ])
+
+    def test_dry_run(self):
+        dict_report = self.obj_replacer.replace(self.dict_refs)
+        self.assertEqual(dict_report['lst_rule_hits'], [3, 1, 2, 1])
+        self.assertEqual(dict_report['dict_changes']['a'], [
+            ('title', 'A GUI for power systems', 'A {GUI} for power systems'),
+            ('journal', 'IEEE Transactions on Power Systems', 'IEEE Trans. Power Syst.')])
+        self.assertEqual([iter_item[0] for iter_item in dict_report['dict_changes']['b']], ['journal'])
+        self.assertEqual(self.dict_refs['a'].str_title, 'A GUI for power systems')
+        self.assertEqual(self.obj_replacer.return_diff_printout(dict_report)[:3], [
+            '@@ a title', '- A GUI for power systems', '+ A {GUI} for power systems'])
+
+    def test_replace(self):
+        self.obj_replacer.replace(self.dict_refs, False)
+        self.assertEqual(self.dict_refs['a'].str_title, 'A {GUI} for power systems')
+        self.assertEqual(self.dict_refs['b'].str_title, 'GUIs and system design')
+        self.assertEqual(self.dict_refs['c'].str_booktitle, 'IEEE Trans. Control Syst.')
+        self.assertEqual(self.dict_refs['c'].str_title, 'Control systems')
+        self.assertIs(self.dict_refs['a'].str_journal, self.dict_refs['b'].str_journal)
+        self.assertIs(self.dict_refs['a'].str_journal, sys.intern('IEEE Trans. Power Syst.'))
+
+    def test_invalid_rules(self):
+        for str_rule in ['title GUI => {GUI}',
+                         'jounral: GUI => {GUI}',
+                         'title: /(GUI/ => {GUI}',
+                         'title: /(GUI)/ => {GUI}']:
+            with patch('sys.stdout', new_callable=io.StringIO):
+                with self.assertRaises(GeneralErrorMessage):
+                    BibReplacer().create_rules_from_list([str_rule])
+
+
+if __name__ == '__main__':
+    unittest.main()
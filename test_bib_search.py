@@ -0,0 +1,57 @@
+import unittest
+from bib_parser import BibParser
+from bib_search import BibSearchIndex
+
+
+class BibSearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.dict_refs = {obj_ref.str_id: obj_ref for obj_ref in BibParser.parse_text('''
+@article{abur2004, title = {Power system state estimation: theory and implementation}, author = {Abur, Ali and Exposito, Antonio Gomez}, year = {2004}}
+@article{astrom1995, title = {Adaptive control}, author = {Astr{\\"o}m, Karl J and Wittenmark, Bj{\\"o}rn}, journal = {Automatica}, year = {1995}}
+@inproceedings{sun2020, title = {Robust state estimation}, author = {Sun, Lu}, booktitle = {American Control Conference}, year = {2020}}
+@article{kalman1960, title = {A new approach to linear filtering and prediction problems}, author = {Kalman, Rudolf E}, year = {1960}}
+@article{sun2021, title = {Distributed estimation}, author = {Sun, Lu}, journal = {Automatica}, year = {2021}}
+''')}
+        self.obj_index = BibSearchIndex()
+        self.obj_index.create_index_from_refs(self.dict_refs)
+
+    def return_keys(self, str_query):
+        return sorted(iter_item[0] for iter_item in self.obj_index.search(str_query))
+
+    def test_boolean_queries(self):
+        self.assertEqual(self.return_keys('state estimation'), ['abur2004', 'sun2020'])
+        self.assertEqual(self.return_keys('estimation -sun'), ['abur2004'])
+        self.assertEqual(self.return_keys('estimation NOT author:abur'), ['sun2020', 'sun2021'])
+        self.assertEqual(self.return_keys('kalman OR adaptive'), ['astrom1995', 'kalman1960'])
+        self.assertEqual(self.return_keys('-automatica'), ['abur2004', 'kalman1960', 'sun2020'])
+        self.assertEqual(self.return_keys('nothing'), [])
+
+    def test_field_and_prefix_queries(self):
+        self.assertEqual(self.return_keys('journal:automatica'), ['astrom1995', 'sun2021'])
+        self.assertEqual(self.return_keys('journal:control'), ['sun2020'])
+        self.assertEqual(self.return_keys('author:astrom'), ['astrom1995'])
+        self.assertEqual(self.return_keys('title:filt*'), ['kalman1960'])
+        self.assertEqual(self.return_keys('estimat* year:2019..2021'), ['sun2020', 'sun2021'])
+        self.assertEqual(self.return_keys('year:..1995'), ['astrom1995', 'kalman1960'])
+        self.assertEqual(self.return_keys('year:2020..'), ['sun2020', 'sun2021'])
+
+    def test_ranking(self):
+        lst_results = self.obj_index.search('state estimation OR sun', 2)
+        self.assertEqual(lst_results[0][0], 'sun2020')
+        self.assertEqual(len(lst_results), 2)
+        self.assertGreater(lst_results[0][1], lst_results[1][1])
+
+    def test_add_and_remove_ref(self):
+        self.obj_index.remove_ref('kalman1960')
+        self.assertEqual(self.return_keys('filtering'), [])
+        self.assertNotIn('filtering', self.obj_index.dict_sorted_tokens['title'])
+        obj_reference = self.dict_refs['sun2021']
+        obj_reference.str_title = 'Kalman filtering'
+        self.obj_index.add_ref('sun2021', obj_reference)
+        self.assertEqual(self.return_keys('filtering'), ['sun2021'])
+        self.assertEqual(self.return_keys('distributed'), [])
+        self.assertEqual(len(self.obj_index), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
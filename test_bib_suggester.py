@@ -0,0 +1,49 @@
+import unittest
+from bib_parser import BibParser
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class BibCatidSuggesterTest(unittest.TestCase):
+    def setUp(self):
+        from bib_suggester import BibCatidSuggester
+        self.dict_refs = {obj_ref.str_id: obj_ref for obj_ref in BibParser.parse_text('''
+@article{a, title = {Power system state estimation}, journal = {IEEE Transactions on Power Systems}} % catid = 0x11000000
+@article{b, title = {Robust state estimation with PMUs}, journal = {IEEE Transactions on Power Systems}} % catid = 0x11000000
+@article{c, title = {Adaptive control of linear systems}, journal = {Automatica}} % catid = 0x12000000
+@article{d, title = {Model predictive control}, journal = {Automatica}, author = {Astr{\\"o}m, Karl J}} % catid = 0x12000000
+@article{e, title = {Bad data detection in state estimation and control}}
+@article{f, title = {Predictive control}, author = {Karl J Astr{\\"o}m}} % catid = 0x10000000
+@article{g, title = {Convex optimization}}
+''')}
+        self.obj_suggester = BibCatidSuggester()
+        self.int_learned = self.obj_suggester.fit(self.dict_refs, {0x11000000, 0x12000000, 0x20000000})
+
+    def test_return_terms(self):
+        self.assertEqual(self.obj_suggester.return_terms(self.dict_refs['d']),
+                         ['t:model', 't:predictive', 't:control', 'j:automatica', 'a:astrom'])
+        self.assertEqual(self.obj_suggester.return_terms(self.dict_refs['f'])[-1], 'a:astrom')
+
+    def test_fit(self):
+        self.assertEqual(self.int_learned, 4)
+        self.assertEqual(self.obj_suggester.lst_leaf_keys, [0x11000000, 0x12000000])
+        self.assertEqual(self.obj_suggester.array_centroids.shape,
+                         (2, len(self.obj_suggester.dict_vocabulary)))
+
+    def test_suggest(self):
+        dict_suggestions = self.obj_suggester.suggest(self.dict_refs, ['e', 'f', 'g'], 1)
+        self.assertEqual([iter_item[0] for iter_item in dict_suggestions['e']], [0x11000000])
+        self.assertEqual([iter_item[0] for iter_item in dict_suggestions['f']], [0x12000000])
+        self.assertEqual(dict_suggestions['g'], [])
+        self.assertTrue(0 < dict_suggestions['f'][0][1] <= 1)
+        dict_suggestions = self.obj_suggester.suggest(self.dict_refs, ['e'], 5)
+        self.assertEqual(len(dict_suggestions['e']), 2)
+        self.assertGreaterEqual(dict_suggestions['e'][0][1], dict_suggestions['e'][1][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,6 +56,33 @@ class BibTableOfContentsTest(unittest.TestCase):
         self.assertEqual(toc.return_tocs_leaf_keys(), [
                          int(0x11000000), int(0x12000000)])
 
+    def test_tree_structure(self):
+        toc = BibTableOfContents()
+        toc.create_tocs_from_multidimensional_list(
+            ['Introduction', ['Methods', ['Sampling'], 'Results'], 'Discussion'])
+        self.assertEqual(toc.return_parent_key(0x11100000), 0x11000000)
+        self.assertEqual(toc.return_parent_key(0x10000000), None)
+        self.assertEqual(toc.return_children_keys(0x10000000),
+                         [0x11000000, 0x12000000])
+        self.assertEqual(toc.return_descendant_keys(0x10000000),
+                         [0x10000000, 0x11000000, 0x11100000, 0x12000000])
+        self.assertEqual(toc.dict_depth[0x11100000], 3)
+        self.assertEqual(toc.return_tocs_leaf_keys(),
+                         [0x11100000, 0x12000000, 0x20000000])
+        self.assertEqual(toc.return_section_path(0x11100000),
+                         ['Introduction', 'Methods', 'Sampling'])
+        self.assertEqual(toc.return_section_path(0x20000000), ['Discussion'])
+        self.assertEqual(toc.return_section_path(0x30000000), [])
+
+    def test_tree_structure_with_internal_zero_digits(self):
+        toc = BibTableOfContents()
+        toc.create_tocs_from_dict({0x10000000: 'A', 0x10100000: 'B',
+                                   0x10200000: 'C', 0x20000000: 'D'})
+        self.assertEqual(toc.return_parent_key(0x10100000), 0x10000000)
+        self.assertEqual(toc.return_tocs_leaf_keys(),
+                         [0x10100000, 0x10200000, 0x20000000])
+        self.assertEqual(toc.return_tocs_printout(), ['A', '        B', '        C', 'D'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from bib_writer import BibWriter
+from bib_parser import BibParser
+from bib_table_of_contents import BibTableOfContents
+
+
+class BibWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.obj_tocs = BibTableOfContents()
+        self.obj_tocs.create_tocs_from_multidimensional_list(
+            ['Introduction', ['Methods', 'Results']])
+
+    def test_return_header_printout(self):
+        str_header = BibWriter.return_header_printout(
+            '/path/to/refs.bib', 'SUN LU', self.obj_tocs)
+        lst_lines = str_header.split('\n')
+        self.assertEqual(lst_lines[0], '%% - Name of bib file: refs.bib')
+        self.assertEqual(lst_lines[2], '%% - Updated by: SUN LU')
+        self.assertEqual(lst_lines[3:], [
+            '%% - Table of Contents',
+            '%% - > Introduction',
+            '%% - >     Methods',
+            '%% - >     Results',
+            '%% - End of Table of Contents',
+            '', ''])
+
+    def test_return_section_keys(self):
+        self.assertEqual(BibWriter.return_section_keys(
+            {-1: {}, -2: {}, -3: {}, 0x12000000: {}, 0x11000000: {}}),
+            [0x11000000, 0x12000000, -1, -3, -2])
+
+    def test_return_section_printout(self):
+        dict_refs = {obj_ref.str_id: obj_ref for obj_ref in BibParser.parse_text(
+            '@book{b, title = {B}} % catid = 0x11000000\n@book{a, title = {A}} % catid = 0x11000000\n')}
+        self.assertEqual(
+            BibWriter.return_section_printout(0x11000000, dict_refs, self.obj_tocs),
+            '\n%% - 0x11000000 Methods\n\n@book{a,\n  title = {A}\n} % catid = 0x11000000'
+            '\n\n@book{b,\n  title = {B}\n} % catid = 0x11000000\n')
+        self.assertEqual(BibWriter.return_section_printout(-1, {}, self.obj_tocs),
+                         '\n%% - Uncategorized references\n')
+
+    def test_write_atomically(self):
+        with tempfile.TemporaryDirectory() as str_dir:
+            path_bib = os.path.join(str_dir, 'refs.bib')
+            with open(path_bib, 'w') as file_bib:
+                file_bib.write('old')
+            self.assertEqual(BibWriter.write_atomically(path_bib, ['a\n', 'b\n']), 4)
+            with open(path_bib, 'r') as file_bib:
+                self.assertEqual(file_bib.read(), 'a\nb\n')
+            with patch('os.replace', side_effect=OSError):
+                with self.assertRaises(OSError):
+                    BibWriter.write_atomically(path_bib, ['c\n'])
+            with open(path_bib, 'r') as file_bib:
+                self.assertEqual(file_bib.read(), 'a\nb\n')
+            self.assertEqual(os.listdir(str_dir), ['refs.bib'])
+
+
+if __name__ == '__main__':
+    unittest.main()